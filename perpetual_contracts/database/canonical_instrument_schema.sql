@@ -0,0 +1,33 @@
+-- 标准化合约表 Schema
+-- 跨所有交易所的等价合约（精确映射组 + 模糊匹配），由 generate_mappings.py 通过并查集生成
+-- 每个交易所合约一行，同一标准化合约的成员共享 instrument_id；不要求XT上线该交易对
+
+CREATE TABLE IF NOT EXISTS canonical_instruments (
+    instrument_id integer NOT NULL,
+    canonical_pair text NOT NULL,
+    exchange text NOT NULL,
+    symbol text NOT NULL,
+    base text,
+    quote text,
+    multiplier integer DEFAULT 1,
+    match_type text NOT NULL,  -- exact / fuzzy
+    updated_at timestamp without time zone DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT canonical_instruments_pkey PRIMARY KEY (exchange, symbol)
+);
+
+-- 创建索引
+CREATE INDEX IF NOT EXISTS idx_canonical_instrument_id ON canonical_instruments(instrument_id);
+CREATE INDEX IF NOT EXISTS idx_canonical_pair ON canonical_instruments(canonical_pair);
+
+-- 添加注释
+COMMENT ON TABLE canonical_instruments IS '标准化合约表 - 任意交易所合约到其他交易所等价合约的映射';
+COMMENT ON COLUMN canonical_instruments.instrument_id IS '标准化合约ID（每次生成映射时重新编号）';
+COMMENT ON COLUMN canonical_instruments.canonical_pair IS '标准化交易对（分量内精确映射最多的交易对）';
+COMMENT ON COLUMN canonical_instruments.match_type IS '加入方式: exact 精确映射 / fuzzy 模糊匹配';
+
+-- 示例查询：Bybit 1000PEPEUSDT 在 OKX 的等价合约
+-- SELECT o.symbol, o.multiplier
+-- FROM canonical_instruments b
+-- JOIN canonical_instruments o ON o.instrument_id = b.instrument_id AND o.exchange = 'okx'
+-- WHERE b.exchange = 'bybit' AND b.symbol = '1000PEPEUSDT';
@@ -33,7 +33,7 @@ CREATE TABLE public.binance_perpetual (
     contracttype text,
     deliverydate text,
     filters text,
-    filters_dict text,
+    filters_dict jsonb,
     liquidationfee text,
     maintmarginpercent text,
     marginasset text,
@@ -43,8 +43,8 @@ CREATE TABLE public.binance_perpetual (
     ordertypes text,
     pair text,
     permissionsets text,
-    priceprecision text,
-    quantityprecision text,
+    priceprecision bigint,
+    quantityprecision bigint,
     quoteasset text,
     quoteprecision text,
     requiredmarginpercent text,
@@ -95,11 +95,11 @@ CREATE TABLE public.bybit_perpetual (
     fundinginterval text,
     isprelisting text,
     launchtime text,
-    leveragefilter text,
-    lotsizefilter text,
+    leveragefilter jsonb,
+    lotsizefilter jsonb,
     lowerfundingrate text,
     prelistinginfo text,
-    pricefilter text,
+    pricefilter jsonb,
     pricescale text,
     quotecoin text,
     riskparameters text,
@@ -455,7 +455,7 @@ CREATE TABLE public.mexc_perpetual (
     positionopentype text,
     premarket text,
     pricecoefficientvariation text,
-    pricescale text,
+    pricescale bigint,
     priceunit text,
     quotecoin text,
     quotecoinname text,
@@ -480,7 +480,7 @@ CREATE TABLE public.mexc_perpetual (
     triggerprotect text,
     type text,
     vid text,
-    volscale text,
+    volscale bigint,
     volunit text,
     created_at timestamp without time zone DEFAULT CURRENT_TIMESTAMP,
     updated_at timestamp without time zone DEFAULT CURRENT_TIMESTAMP
@@ -827,9 +827,9 @@ CREATE TABLE public.xt_perpetual (
     predicteventparam text,
     predicteventsort text,
     predicteventtype text,
-    priceprecision text,
+    priceprecision bigint,
     producttype text,
-    quantityprecision text,
+    quantityprecision bigint,
     quotecoin text,
     quotecoindisplayprecision text,
     quotecoinprecision text,
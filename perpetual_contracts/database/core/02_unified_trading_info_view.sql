@@ -5,6 +5,45 @@
 -- ============================================================================
 
 DROP VIEW IF EXISTS v_unified_trading_info CASCADE;
+DROP VIEW IF EXISTS v_unified_trading_info_wide CASCADE;
+-- v_raw_data 整行引用原始表，迁移列类型前先删除，由 03_raw_data_view.sql 重建
+DROP VIEW IF EXISTS v_raw_data CASCADE;
+
+-- ============================================================================
+-- 原始表列类型迁移
+-- 视图直接读取原生类型（JSONB / BIGINT），不再逐行 ::jsonb / ::int 解析文本；
+-- 旧库中仍为 TEXT 的列在此迁移，已迁移的列跳过
+-- ============================================================================
+DO $$
+DECLARE
+    col record;
+BEGIN
+    FOR col IN
+        SELECT m.table_name, m.column_name, m.new_type
+        FROM (VALUES
+            ('xt_perpetual', 'priceprecision', 'bigint'),
+            ('xt_perpetual', 'quantityprecision', 'bigint'),
+            ('binance_perpetual', 'priceprecision', 'bigint'),
+            ('binance_perpetual', 'quantityprecision', 'bigint'),
+            ('binance_perpetual', 'filters_dict', 'jsonb'),
+            ('bybit_perpetual', 'pricefilter', 'jsonb'),
+            ('bybit_perpetual', 'lotsizefilter', 'jsonb'),
+            ('bybit_perpetual', 'leveragefilter', 'jsonb'),
+            ('mexc_perpetual', 'pricescale', 'bigint'),
+            ('mexc_perpetual', 'volscale', 'bigint')
+        ) AS m(table_name, column_name, new_type)
+        JOIN information_schema.columns c
+          ON c.table_schema = current_schema()
+         AND c.table_name = m.table_name
+         AND c.column_name = m.column_name
+        WHERE c.data_type = 'text'
+    LOOP
+        EXECUTE format(
+            'ALTER TABLE %I ALTER COLUMN %I TYPE %s USING NULLIF(%I, '''')::%s',
+            col.table_name, col.column_name, col.new_type, col.column_name, col.new_type
+        );
+    END LOOP;
+END $$;
 
 CREATE VIEW v_unified_trading_info AS
 WITH base_mapping AS (
@@ -42,8 +81,8 @@ SELECT
         'base_asset', xt.basecoin,
         'quote_asset', xt.quotecoin,
         'multiplier', bm.xt_multiplier,
-        'price_precision', xt.priceprecision::int,
-        'quantity_precision', xt.quantityprecision::int,
+        'price_precision', xt.priceprecision,
+        'quantity_precision', xt.quantityprecision,
         'tick_size', xt.minstepprice,
         'min_price', xt.minprice,
         'max_price', xt.maxprice,
@@ -71,16 +110,16 @@ SELECT
             'base_asset', bn.baseasset,
             'quote_asset', bn.quoteasset,
             'multiplier', bm.exchange_multiplier,
-            'price_precision', bn.priceprecision::int,
-            'quantity_precision', bn.quantityprecision::int,
-            'tick_size', (bn.filters_dict::jsonb -> 'PRICE_FILTER' ->> 'tickSize'),
-            'min_price', (bn.filters_dict::jsonb -> 'PRICE_FILTER' ->> 'minPrice'),
-            'max_price', (bn.filters_dict::jsonb -> 'PRICE_FILTER' ->> 'maxPrice'),
-            'step_size', (bn.filters_dict::jsonb -> 'LOT_SIZE' ->> 'stepSize'),
-            'min_qty', (bn.filters_dict::jsonb -> 'LOT_SIZE' ->> 'minQty'),
-            'max_qty', (bn.filters_dict::jsonb -> 'LOT_SIZE' ->> 'maxQty'),
-            'max_market_qty', (bn.filters_dict::jsonb -> 'MARKET_LOT_SIZE' ->> 'maxQty'),
-            'min_notional', (bn.filters_dict::jsonb -> 'MIN_NOTIONAL' ->> 'notional'),
+            'price_precision', bn.priceprecision,
+            'quantity_precision', bn.quantityprecision,
+            'tick_size', (bn.filters_dict -> 'PRICE_FILTER' ->> 'tickSize'),
+            'min_price', (bn.filters_dict -> 'PRICE_FILTER' ->> 'minPrice'),
+            'max_price', (bn.filters_dict -> 'PRICE_FILTER' ->> 'maxPrice'),
+            'step_size', (bn.filters_dict -> 'LOT_SIZE' ->> 'stepSize'),
+            'min_qty', (bn.filters_dict -> 'LOT_SIZE' ->> 'minQty'),
+            'max_qty', (bn.filters_dict -> 'LOT_SIZE' ->> 'maxQty'),
+            'max_market_qty', (bn.filters_dict -> 'MARKET_LOT_SIZE' ->> 'maxQty'),
+            'min_notional', (bn.filters_dict -> 'MIN_NOTIONAL' ->> 'notional'),
             'max_notional', NULL,
             'contract_size', NULL,
             'min_leverage', NULL,
@@ -125,18 +164,18 @@ SELECT
             'multiplier', bm.exchange_multiplier,
             'price_precision', bb.pricescale::int,
             'quantity_precision', NULL,
-            'tick_size', (bb.pricefilter::jsonb ->> 'tickSize'),
-            'min_price', (bb.pricefilter::jsonb ->> 'minPrice'),
-            'max_price', (bb.pricefilter::jsonb ->> 'maxPrice'),
-            'step_size', (bb.lotsizefilter::jsonb ->> 'qtyStep'),
-            'min_qty', (bb.lotsizefilter::jsonb ->> 'minOrderQty'),
-            'max_qty', (bb.lotsizefilter::jsonb ->> 'maxOrderQty'),
-            'max_market_qty', (bb.lotsizefilter::jsonb ->> 'maxMktOrderQty'),
-            'min_notional', (bb.lotsizefilter::jsonb ->> 'minNotionalValue'),
+            'tick_size', (bb.pricefilter ->> 'tickSize'),
+            'min_price', (bb.pricefilter ->> 'minPrice'),
+            'max_price', (bb.pricefilter ->> 'maxPrice'),
+            'step_size', (bb.lotsizefilter ->> 'qtyStep'),
+            'min_qty', (bb.lotsizefilter ->> 'minOrderQty'),
+            'max_qty', (bb.lotsizefilter ->> 'maxOrderQty'),
+            'max_market_qty', (bb.lotsizefilter ->> 'maxMktOrderQty'),
+            'min_notional', (bb.lotsizefilter ->> 'minNotionalValue'),
             'max_notional', NULL,
             'contract_size', NULL,
-            'min_leverage', (bb.leveragefilter::jsonb ->> 'minLeverage'),
-            'max_leverage', (bb.leveragefilter::jsonb ->> 'maxLeverage')
+            'min_leverage', (bb.leveragefilter ->> 'minLeverage'),
+            'max_leverage', (bb.leveragefilter ->> 'maxLeverage')
         )
     END AS bybit_info,
 
@@ -200,8 +239,8 @@ SELECT
             'base_asset', mx.basecoin,
             'quote_asset', mx.quotecoin,
             'multiplier', bm.exchange_multiplier,
-            'price_precision', mx.pricescale::int,
-            'quantity_precision', mx.volscale::int,
+            'price_precision', mx.pricescale,
+            'quantity_precision', mx.volscale,
             'tick_size', mx.priceunit,
             'min_price', NULL,
             'max_price', NULL,
@@ -347,8 +386,8 @@ SELECT
         'base_asset', xt.basecoin,
         'quote_asset', xt.quotecoin,
         'multiplier', xm.xt_multiplier,
-        'price_precision', xt.priceprecision::int,
-        'quantity_precision', xt.quantityprecision::int,
+        'price_precision', xt.priceprecision,
+        'quantity_precision', xt.quantityprecision,
         'tick_size', xt.minstepprice,
         'min_price', xt.minprice,
         'max_price', xt.maxprice,
@@ -365,9 +404,9 @@ SELECT
         'match_type', upm.match_type,
         'similarity', upm.string_similarity,
         'multiplier', upm.exchange_multiplier,
-        'tick_size', bn.filters_dict::jsonb -> 'PRICE_FILTER' ->> 'tickSize',
-        'min_qty', bn.filters_dict::jsonb -> 'LOT_SIZE' ->> 'minQty',
-        'min_notional', bn.filters_dict::jsonb -> 'MIN_NOTIONAL' ->> 'notional'
+        'tick_size', bn.filters_dict -> 'PRICE_FILTER' ->> 'tickSize',
+        'min_qty', bn.filters_dict -> 'LOT_SIZE' ->> 'minQty',
+        'min_notional', bn.filters_dict -> 'MIN_NOTIONAL' ->> 'notional'
     ) FROM unified_pair_mappings upm
     JOIN binance_perpetual bn ON upm.exchange_symbol = bn.symbol
     WHERE upm.xt_symbol = xm.xt_symbol AND upm.exchange = 'binance' AND upm.verified = true
@@ -396,9 +435,9 @@ SELECT
         'match_type', upm.match_type,
         'similarity', upm.string_similarity,
         'multiplier', upm.exchange_multiplier,
-        'tick_size', bb.pricefilter::jsonb ->> 'tickSize',
-        'min_qty', bb.lotsizefilter::jsonb ->> 'minOrderQty',
-        'min_notional', bb.lotsizefilter::jsonb ->> 'minNotionalValue'
+        'tick_size', bb.pricefilter ->> 'tickSize',
+        'min_qty', bb.lotsizefilter ->> 'minOrderQty',
+        'min_notional', bb.lotsizefilter ->> 'minNotionalValue'
     ) FROM unified_pair_mappings upm
     JOIN bybit_perpetual bb ON upm.exchange_symbol = bb.symbol
     WHERE upm.xt_symbol = xm.xt_symbol AND upm.exchange = 'bybit' AND upm.verified = true
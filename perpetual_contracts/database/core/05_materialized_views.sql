@@ -0,0 +1,63 @@
+-- ============================================================================
+-- 统一交易信息物化视图
+-- ============================================================================
+--
+-- 【用途】
+--   v_unified_trading_info / v_unified_trading_info_wide 每次查询都要关联 7 张原始表
+--   并为每个交易所构造 jsonb_build_object，而数据只在数据采集流程运行时才变化。
+--   这里把两个视图物化，交易侧查询直接走唯一索引
+--
+-- 【刷新】
+--   数据采集（main.py）结束时由 DatabaseManager.refresh_materialized_views() 执行；
+--   视图还依赖映射表，update_all_data.sh 在映射生成之后再由 refresh_views.py 刷新一次
+--   REFRESH MATERIALIZED VIEW CONCURRENTLY：只写入有变化的行，刷新期间不阻塞读取。
+--   手动刷新:
+--     REFRESH MATERIALIZED VIEW CONCURRENTLY mv_unified_trading_info;
+--     REFRESH MATERIALIZED VIEW CONCURRENTLY mv_unified_trading_info_wide;
+--
+-- 【依赖】
+--   基于 02_unified_trading_info_view.sql 中的视图，02 重建视图时会级联删除本文件的物化视图，
+--   需要重新执行本文件（init_database.sh / update_views.sh 已包含）
+--
+-- ============================================================================
+
+DROP MATERIALIZED VIEW IF EXISTS mv_unified_trading_info CASCADE;
+
+CREATE MATERIALIZED VIEW mv_unified_trading_info AS
+SELECT * FROM v_unified_trading_info;
+
+-- unified_pair_mappings 上 (xt_symbol, exchange) 唯一，原始表按主键关联，每个组合只有一行
+CREATE UNIQUE INDEX idx_mv_unified_trading_info_key
+    ON mv_unified_trading_info (xt_symbol, matched_exchange);
+CREATE INDEX idx_mv_unified_trading_info_pair
+    ON mv_unified_trading_info (normalized_pair);
+
+COMMENT ON MATERIALIZED VIEW mv_unified_trading_info IS '统一交易信息物化视图 - v_unified_trading_info 的物化版本，采集流程结束时并发刷新';
+
+
+DROP MATERIALIZED VIEW IF EXISTS mv_unified_trading_info_wide CASCADE;
+
+CREATE MATERIALIZED VIEW mv_unified_trading_info_wide AS
+SELECT * FROM v_unified_trading_info_wide;
+
+-- 宽表一行一个 XT 交易对（标准化交易对由 XT 交易对本身决定）
+CREATE UNIQUE INDEX idx_mv_unified_trading_info_wide_key
+    ON mv_unified_trading_info_wide (xt_symbol, normalized_pair);
+
+COMMENT ON MATERIALIZED VIEW mv_unified_trading_info_wide IS '统一交易信息宽表物化视图 - v_unified_trading_info_wide 的物化版本，采集流程结束时并发刷新';
+
+-- ============================================================================
+-- 使用示例
+-- ============================================================================
+--
+-- 1. 查询单个 XT 交易对在所有交易所的信息（走唯一索引）:
+-- SELECT * FROM mv_unified_trading_info WHERE xt_symbol = 'btc_usdt';
+--
+-- 2. 查询单个交易对在指定交易所的信息:
+-- SELECT xt_info, binance_info FROM mv_unified_trading_info
+-- WHERE xt_symbol = 'btc_usdt' AND matched_exchange = 'binance';
+--
+-- 3. 宽表查询:
+-- SELECT * FROM mv_unified_trading_info_wide WHERE xt_symbol = 'btc_usdt';
+--
+-- ============================================================================
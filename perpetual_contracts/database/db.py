@@ -1,10 +1,27 @@
 """
-数据库操作模块 - TEXT类型版本
-所有字段统一转换为TEXT存储
+数据库操作模块 - 原始字段存储版本
+列类型由 utils.schema_generator 根据API数据推断，写入时按列类型原生绑定
 """
 import asyncpg
-from typing import List, Dict
+from decimal import Decimal, InvalidOperation
+from typing import List, Dict, Tuple
 import json
+import re
+
+from utils.schema_generator import collect_all_fields
+from .json_codec import register_json_codecs
+from .spec_history import create_history_table, record_spec_changes
+
+# 整数列的取值范围，超出范围的值无法绑定
+INTEGER_RANGES = {
+    'smallint': (-2 ** 15, 2 ** 15 - 1),
+    'integer': (-2 ** 31, 2 ** 31 - 1),
+    'bigint': (-2 ** 63, 2 ** 63 - 1),
+}
+INTEGER_TYPES = tuple(INTEGER_RANGES)
+
+# database/core/05_materialized_views.sql 中定义的物化视图
+MATERIALIZED_VIEWS = ('mv_unified_trading_info', 'mv_unified_trading_info_wide')
 
 
 class DatabaseManager:
@@ -13,10 +30,16 @@ class DatabaseManager:
     def __init__(self, db_config: dict):
         self.db_config = db_config
         self.pool = None
+        # 批量写入时被拒绝的行 {table_name: [(主键值, 原因)]}
+        self.rejects: Dict[str, List[Tuple]] = {}
+        # 表结构缓存 {table_name: {列名: data_type}}
+        self._column_cache: Dict[str, Dict[str, str]] = {}
 
     async def connect(self):
         """创建数据库连接池"""
-        self.pool = await asyncpg.create_pool(**self.db_config)
+        self.pool = await asyncpg.create_pool(**self.db_config, init=register_json_codecs)
+        async with self.pool.acquire() as conn:
+            await create_history_table(conn)
         print("✅ 数据库连接成功")
 
     async def close(self):
@@ -29,8 +52,27 @@ class DatabaseManager:
         """执行schema SQL"""
         async with self.pool.acquire() as conn:
             await conn.execute(schema_sql)
+        self._column_cache.clear()
         print("✅ 数据库表结构创建成功")
 
+    async def refresh_materialized_views(self, views=MATERIALIZED_VIEWS):
+        """
+        刷新统一交易信息物化视图
+
+        使用 CONCURRENTLY 只写入有变化的行，刷新期间读取不受影响；
+        物化视图尚未填充数据时退回普通刷新，尚未创建时跳过
+        """
+        async with self.pool.acquire() as conn:
+            for view in views:
+                try:
+                    await conn.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}")
+                except asyncpg.UndefinedTableError:
+                    print(f"⚠️  {view}: 物化视图不存在，跳过（请执行 database/core/05_materialized_views.sql）")
+                    continue
+                except asyncpg.ObjectNotInPrerequisiteStateError:
+                    await conn.execute(f"REFRESH MATERIALIZED VIEW {view}")
+                print(f"✅ {view}: 物化视图已刷新")
+
     async def truncate_table(self, table_name: str):
         """清空表数据"""
         async with self.pool.acquire() as conn:
@@ -48,9 +90,163 @@ class DatabaseManager:
         else:
             return str(value)
 
+    def _convert_value(self, value, column_type: str = 'text'):
+        """
+        按列类型转换为 asyncpg 可原生绑定的值
+
+        Raises:
+            ValueError: 值无法转换为列类型（交易所字段类型漂移）。COPY / executemany 中任何一个
+                        无法绑定的值都会让整批失败，所以必须在写入前发现并剔除该行
+        """
+        if value is None:
+            return None
+
+        if column_type == 'jsonb':
+            # 由连接上注册的JSONB编解码器直接序列化
+            return value
+
+        if column_type == 'boolean':
+            if isinstance(value, bool):
+                return value
+            if isinstance(value, str) and value.lower() in ('true', 'false'):
+                return value.lower() == 'true'
+
+        elif column_type in INTEGER_TYPES:
+            converted = None
+            if isinstance(value, bool):
+                pass
+            elif isinstance(value, int):
+                converted = value
+            elif isinstance(value, float) and value.is_integer():
+                converted = int(value)
+            elif isinstance(value, str):
+                try:
+                    converted = int(value)
+                except ValueError:
+                    pass
+
+            low, high = INTEGER_RANGES[column_type]
+            if converted is not None and low <= converted <= high:
+                return converted
+
+        elif column_type == 'numeric':
+            if isinstance(value, (int, float, str)) and not isinstance(value, bool):
+                try:
+                    return Decimal(str(value))
+                except InvalidOperation:
+                    pass
+
+        else:
+            # TEXT 及其他未推断的列类型
+            return self._convert_to_text(value)
+
+        raise ValueError(f"类型不匹配: {column_type} 列收到 {value!r}")
+
+    async def get_column_types(self, conn, table_name: str, refresh: bool = False) -> Dict[str, str]:
+        """查询表的列类型 {列名: data_type}，结果按表缓存"""
+        if refresh or table_name not in self._column_cache:
+            rows = await conn.fetch("""
+                SELECT column_name, data_type
+                FROM information_schema.columns
+                WHERE table_schema = current_schema() AND table_name = $1
+            """, table_name)
+            self._column_cache[table_name] = {row['column_name']: row['data_type'] for row in rows}
+        return self._column_cache[table_name]
+
+    async def ensure_columns(self, conn, table_name: str, contracts: List[Dict]) -> Dict[str, str]:
+        """
+        保证 payload 中的字段在表中都有对应列
+
+        交易所新增字段时，用一条 ALTER TABLE ... ADD COLUMN 补齐所有缺失列，
+        而不是让每一行都因为列不存在而失败
+
+        Returns:
+            补齐后的列类型 {列名: data_type}
+        """
+        column_types = await self.get_column_types(conn, table_name)
+
+        missing = {}
+        for field_name, field_type in collect_all_fields(contracts).items():
+            column = field_name.lower()
+            if column not in column_types:
+                missing[column] = field_type
+
+        if missing:
+            add_parts = [f"ADD COLUMN IF NOT EXISTS {column} {field_type}" for column, field_type in missing.items()]
+            await conn.execute(f"ALTER TABLE {table_name} {', '.join(add_parts)}")
+            column_types.update({column: field_type.lower() for column, field_type in missing.items()})
+            print(f"✅ {table_name}: 新增 {len(missing)} 列 ({', '.join(missing)})")
+
+        return column_types
+
+    @staticmethod
+    async def get_view_dependencies(conn, table_name: str) -> Tuple[set, List[str]]:
+        """
+        查询视图或物化视图对表的依赖
+
+        pg_depend 中 refobjsubid = 0 的依赖是对整张表的引用（如 to_jsonb(xt.*) 的整行引用），
+        无法区分具体的列，保守地视为引用了所有列
+
+        Returns:
+            (columns, whole_row_views): 被引用的列，整表引用该表的视图
+        """
+        rows = await conn.fetch("""
+            SELECT DISTINCT r.ev_class::regclass::text AS view_name, a.attname
+            FROM pg_depend d
+            JOIN pg_rewrite r ON r.oid = d.objid
+            LEFT JOIN pg_attribute a
+                ON a.attrelid = d.refobjid AND a.attnum = d.refobjsubid AND d.refobjsubid > 0
+            WHERE d.refobjid = $1::regclass AND r.ev_class <> $1::regclass
+        """, table_name)
+        columns = {row['attname'] for row in rows if row['attname'] is not None}
+        whole_row_views = sorted({row['view_name'] for row in rows if row['attname'] is None})
+        return columns, whole_row_views
+
+    async def migrate_column_types(self, table_name: str, contracts: List[Dict], primary_key: str = 'symbol'):
+        """
+        将仍为TEXT、但数据可推断出原生类型的列迁移为推断类型
+
+        被视图/物化视图引用的列无法直接修改类型，迁移前按 pg_depend 跳过，保留TEXT
+        （视图引用的列由 database/core/02_unified_trading_info_view.sql 统一迁移），
+        避免每次启动都重复执行并打印同一条失败的 ALTER；
+        有视图整表引用时（如 v_raw_data 的 to_jsonb(xt.*)）所有列都无法修改，跳过整张表
+        """
+        if not contracts:
+            return
+
+        field_types = collect_all_fields(contracts)
+
+        async with self.pool.acquire() as conn:
+            column_types = await self.get_column_types(conn, table_name)
+            view_columns, whole_row_views = await self.get_view_dependencies(conn, table_name)
+            if whole_row_views:
+                print(f"⚠️  {table_name}: 被视图整表引用 ({', '.join(whole_row_views)})，跳过列类型迁移")
+                return
+
+            for field_name, field_type in field_types.items():
+                column = field_name.lower()
+                if field_name == primary_key or field_type == 'TEXT':
+                    continue
+                if column_types.get(column) != 'text' or column in view_columns:
+                    continue
+
+                try:
+                    await conn.execute(
+                        f"ALTER TABLE {table_name} ALTER COLUMN {column} TYPE {field_type} "
+                        f"USING NULLIF({column}, '')::{field_type}"
+                    )
+                    column_types[column] = field_type.lower()
+                    print(f"✅ {table_name}.{column}: TEXT -> {field_type}")
+                except Exception as e:
+                    print(f"⚠️  {table_name}.{column}: 保留TEXT ({e})")
+
     async def insert_contracts(self, table_name: str, contracts: List[Dict], primary_key: str = 'symbol'):
         """
-        插入合约数据（TEXT模式）
+        插入合约数据（逐行upsert）
+
+        所有行使用同一条按整张表列集合生成的upsert语句，由 fetchmany 复用同一个预处理语句；
+        整批失败时逐行执行同一预处理语句（每行一个保存点），报告每一行的错误。
+        内容变化的行在同一事务内写入 contract_spec_history 规格历史
 
         Args:
             table_name: 表名
@@ -61,43 +257,536 @@ class DatabaseManager:
             return 0
 
         async with self.pool.acquire() as conn:
-            success_count = 0
+            column_types = await self.ensure_columns(conn, table_name, contracts)
+            columns, records, rejects = self._prepare_rows(contracts, primary_key, column_types)
+            self._report_rejects(table_name, rejects)
 
-            for contract in contracts:
-                try:
-                    # 准备字段和值
-                    fields = []
-                    values = []
-                    placeholders = []
-
-                    for i, (key, value) in enumerate(contract.items(), 1):
-                        # 如果字段名为id，重命名为api_id避免与自增id冲突
-                        if key == 'id':
-                            key = 'api_id'
-                        fields.append(key)
-
-                        # 所有值都转换为TEXT
-                        values.append(self._convert_to_text(value))
-                        placeholders.append(f"${i}")
-
-                    # 构建INSERT语句
-                    insert_sql = f"""
-                        INSERT INTO {table_name} ({', '.join(fields)})
-                        VALUES ({', '.join(placeholders)})
-                        ON CONFLICT ({primary_key}) DO UPDATE SET
-                    """
-
-                    # 添加更新字段
-                    update_parts = [f"{field} = EXCLUDED.{field}" for field in fields if field != primary_key]
-                    update_parts.append("updated_at = CURRENT_TIMESTAMP")
-                    insert_sql += ", ".join(update_parts)
-
-                    await conn.execute(insert_sql, *values)
-                    success_count += 1
+            if not records:
+                return 0
 
-                except Exception as e:
-                    print(f"❌ 插入失败 {contract.get(primary_key)}: {e}")
-                    continue
+            pk_column = primary_key.lower()
+            upsert_sql = self._upsert_sql(table_name, columns, pk_column, only_changed=True)
+            specs = {str(contract.get(primary_key)): contract for contract in contracts}
+
+            try:
+                async with conn.transaction():
+                    changed = await conn.fetchmany(upsert_sql, records)
+                    await record_spec_changes(
+                        conn, table_name, [(row[pk_column], specs[row[pk_column]]) for row in changed]
+                    )
+                success_count = len(records)
+            except Exception:
+                pk_index = columns.index(pk_column)
+                success_count = 0
+                changed = []
+
+                async with conn.transaction():
+                    statement = await conn.prepare(upsert_sql)
+                    for record in records:
+                        try:
+                            async with conn.transaction():
+                                changed.extend(await statement.fetch(*record))
+                            success_count += 1
+                        except Exception as e:
+                            print(f"❌ 插入失败 {record[pk_index]}: {e}")
+
+                    await record_spec_changes(
+                        conn, table_name, [(row[pk_column], specs[row[pk_column]]) for row in changed]
+                    )
 
             print(f"✅ {table_name}: {success_count}/{len(contracts)} 条数据插入成功")
             return success_count
+
+    @staticmethod
+    def _change_filter(table_name: str, columns: List[str], pk_column: str) -> str:
+        """upsert 的 WHERE 条件：内容未变化的行不更新（由数据库按列类型比较，JSONB按值比较）"""
+        compare_columns = [column for column in columns if column != pk_column]
+        if not compare_columns:
+            return ""
+        return (
+            f"WHERE ({', '.join(f'{table_name}.{column}' for column in compare_columns)}) "
+            f"IS DISTINCT FROM ({', '.join(f'EXCLUDED.{column}' for column in compare_columns)})"
+        )
+
+    @classmethod
+    def _upsert_sql(cls, table_name: str, columns: List[str], pk_column: str,
+                    only_changed: bool = False) -> str:
+        """
+        生成单行upsert语句（同一张表的所有行共用）
+
+        Args:
+            only_changed: 为True时内容未变化的行不更新，并返回实际写入的行 (主键, inserted)
+        """
+        placeholders = [f"${i}" for i in range(1, len(columns) + 1)]
+        update_parts = [f"{column} = EXCLUDED.{column}" for column in columns if column != pk_column]
+        update_parts.append("updated_at = CURRENT_TIMESTAMP")
+        sql = f"""
+            INSERT INTO {table_name} ({', '.join(columns)})
+            VALUES ({', '.join(placeholders)})
+            ON CONFLICT ({pk_column}) DO UPDATE SET {', '.join(update_parts)}
+        """
+        if only_changed:
+            sql += f"""
+            {cls._change_filter(table_name, columns, pk_column)}
+            RETURNING {pk_column}, (xmax = 0) AS inserted
+        """
+        return sql
+
+    def _prepare_rows(self, contracts: List[Dict], primary_key: str,
+                      column_types: Dict[str, str]) -> Tuple[List[str], List[tuple], List[Tuple]]:
+        """
+        将合约整理为列式记录（批量写入用）
+
+        列名统一为小写（与未加引号的建表语句一致），id 重命名为 api_id，值按列类型转换；
+        缺少主键、字段值与列类型不匹配的行放入拒绝列表，不影响同批其他行；
+        主键重复时保留最后一条（与逐行upsert结果一致）
+
+        Returns:
+            (columns, records, rejects)
+        """
+        pk_column = primary_key.lower()
+        columns = []
+        seen_columns = set()
+        rows = {}
+        rejects = []
+
+        for contract in contracts:
+            pk_value = contract.get(primary_key)
+            if not pk_value:
+                rejects.append((pk_value, '缺少主键'))
+                continue
+
+            row = {}
+            try:
+                for key, value in contract.items():
+                    column = 'api_id' if key == 'id' else key.lower()
+                    row[column] = self._convert_value(value, column_types.get(column, 'text'))
+            except ValueError as e:
+                rejects.append((pk_value, f"{column}: {e}"))
+                continue
+
+            for column in row:
+                if column not in seen_columns:
+                    seen_columns.add(column)
+                    columns.append(column)
+
+            pk_text = row[pk_column]
+            if pk_text in rows:
+                rejects.append((pk_value, '主键重复，保留最后一条'))
+            rows[pk_text] = row
+
+        records = [tuple(row.get(column) for column in columns) for row in rows.values()]
+        return columns, records, rejects
+
+    async def _merge_records(self, conn, table_name: str, columns: List[str], records: List[tuple],
+                             primary_key: str, only_changed: bool = False) -> List:
+        """
+        将记录 COPY 到临时表 _staging_{table} 后一次性 upsert 到目标表（需在事务内调用）
+
+        Args:
+            only_changed: 为True时内容未变化的行不更新（由数据库按列类型比较，JSONB按值比较）
+
+        Returns:
+            实际写入的行 [(主键, inserted)]，inserted 表示新插入
+        """
+
+        pk_column = primary_key.lower()
+        staging = f"_staging_{table_name}"
+        column_list = ', '.join(columns)
+        update_parts = [f"{column} = EXCLUDED.{column}" for column in columns if column != pk_column]
+        update_parts.append("updated_at = CURRENT_TIMESTAMP")
+
+        change_filter = self._change_filter(table_name, columns, pk_column) if only_changed else ""
+
+        await conn.execute(f"""
+            CREATE TEMP TABLE {staging} ON COMMIT DROP AS
+            SELECT {column_list} FROM {table_name} WITH NO DATA
+        """)
+        await conn.copy_records_to_table(staging, records=records, columns=columns)
+        return await conn.fetch(f"""
+            INSERT INTO {table_name} ({column_list})
+            SELECT {column_list} FROM {staging}
+            ON CONFLICT ({pk_column}) DO UPDATE SET {', '.join(update_parts)}
+            {change_filter}
+            RETURNING {pk_column}, (xmax = 0) AS inserted
+        """)
+
+    def _report_rejects(self, table_name: str, rejects: List[Tuple]):
+        """记录并打印预检查被拒绝的行"""
+        self.rejects[table_name] = rejects
+        for pk_value, reason in rejects:
+            print(f"❌ 插入失败 {pk_value}: {reason}")
+
+    async def bulk_insert_contracts(self, table_name: str, contracts: List[Dict], primary_key: str = 'symbol'):
+        """
+        批量插入合约数据（COPY + 集合式upsert）
+
+        整个交易所的数据一次 COPY 到临时表，再用一条 INSERT ... SELECT ... ON CONFLICT
+        合并到目标表，内容变化的行在同一事务内写入 contract_spec_history 规格历史。
+        只插入/更新，不删除已下架的合约（需要删除时用 sync_contracts 或 reload_contracts）。
+        预检查不通过的行记入 self.rejects[table_name]；
+        批量合并失败时回退到逐行插入，由逐行插入报告每一行的错误
+
+        Args:
+            table_name: 表名
+            contracts: 合约数据列表
+            primary_key: 主键字段名
+        """
+        if not contracts:
+            return 0
+
+        pk_column = primary_key.lower()
+        specs = {str(contract.get(primary_key)): contract for contract in contracts}
+
+        try:
+            async with self.pool.acquire() as conn:
+                column_types = await self.ensure_columns(conn, table_name, contracts)
+                columns, records, rejects = self._prepare_rows(contracts, primary_key, column_types)
+
+                if records:
+                    async with conn.transaction():
+                        changed = await self._merge_records(
+                            conn, table_name, columns, records, primary_key, only_changed=True
+                        )
+                        await record_spec_changes(
+                            conn, table_name, [(row[pk_column], specs[row[pk_column]]) for row in changed]
+                        )
+        except Exception as e:
+            # 逐行插入会重新做预检查并报告被拒绝的行
+            print(f"⚠️  {table_name}: 批量写入失败 ({e})，回退到逐行插入")
+            return await self.insert_contracts(table_name, contracts, primary_key)
+
+        self._report_rejects(table_name, rejects)
+        success_count = len(records)
+
+        print(f"✅ {table_name}: {success_count}/{len(contracts)} 条数据批量写入成功")
+        return success_count
+
+    async def reload_contracts(self, table_name: str, contracts: List[Dict], primary_key: str = 'symbol'):
+        """
+        清空表后全量重新插入（LOAD_MODE = 'reload'）
+
+        整批 COPY 到临时表后在同一个事务内：先与清空前的数据比较，把变化/下架的合约写入
+        contract_spec_history 规格历史，再 TRUNCATE 并从临时表全量插入。
+        事务失败时回滚，保留旧数据；payload 为空（通常是接口失败）时跳过该交易所
+
+        Args:
+            table_name: 表名
+            contracts: 合约数据列表
+            primary_key: 主键字段名
+        """
+        if not contracts:
+            print(f"⚠️  {table_name}: 本次未获取到数据，跳过重新加载")
+            return 0
+
+        pk_column = primary_key.lower()
+        staging = f"_staging_{table_name}"
+
+        async with self.pool.acquire() as conn:
+            column_types = await self.ensure_columns(conn, table_name, contracts)
+            columns, records, rejects = self._prepare_rows(contracts, primary_key, column_types)
+            self._report_rejects(table_name, rejects)
+
+            if not records:
+                return 0
+
+            specs = {str(contract.get(primary_key)): contract for contract in contracts}
+            column_list = ', '.join(columns)
+
+            try:
+                async with conn.transaction():
+                    await conn.execute(f"""
+                        CREATE TEMP TABLE {staging} ON COMMIT DROP AS
+                        SELECT {column_list} FROM {table_name} WITH NO DATA
+                    """)
+                    await conn.copy_records_to_table(staging, records=records, columns=columns)
+
+                    # 清空前比较，否则所有合约都会被当作新上线
+                    changed, delisted = await self._diff_tables(conn, table_name, staging, columns, pk_column)
+                    await record_spec_changes(
+                        conn, table_name, [(pk_value, specs[pk_value]) for pk_value in changed], delisted
+                    )
+
+                    await conn.execute(f"TRUNCATE TABLE {table_name} CASCADE")
+                    await conn.execute(f"""
+                        INSERT INTO {table_name} ({column_list})
+                        SELECT {column_list} FROM {staging}
+                    """)
+            except Exception as e:
+                print(f"❌ {table_name}: 重新加载失败，保留旧数据: {e}")
+                return 0
+
+        print(f"✅ {table_name}: {len(records)}/{len(contracts)} 条数据重新加载, "
+              f"变化 {len(changed)}, 下架 {len(delisted)}")
+        return len(records)
+
+    @staticmethod
+    async def _diff_tables(conn, table_name: str, source: str, columns: List[str],
+                           pk_column: str) -> Tuple[List[str], List[str]]:
+        """
+        比较新数据表 source 与目标表（按列类型比较，JSONB按值比较）
+
+        Returns:
+            (changed, delisted): 新上线或内容变化的主键，目标表中有而 source 中没有的主键
+        """
+        compare_columns = [column for column in columns if column != pk_column]
+        change_filter = ""
+        if compare_columns:
+            change_filter = (
+                f"OR ({', '.join(f't.{column}' for column in compare_columns)}) "
+                f"IS DISTINCT FROM ({', '.join(f's.{column}' for column in compare_columns)})"
+            )
+
+        changed = await conn.fetch(f"""
+            SELECT s.{pk_column}
+            FROM {source} s
+            LEFT JOIN {table_name} t ON t.{pk_column} = s.{pk_column}
+            WHERE t.{pk_column} IS NULL {change_filter}
+        """)
+        delisted = await conn.fetch(f"""
+            SELECT t.{pk_column}
+            FROM {table_name} t
+            WHERE NOT EXISTS (SELECT 1 FROM {source} s WHERE s.{pk_column} = t.{pk_column})
+        """)
+        return [row[pk_column] for row in changed], [row[pk_column] for row in delisted]
+
+    async def sync_contracts(self, table_name: str, contracts: List[Dict], primary_key: str = 'symbol'):
+        """
+        增量同步合约数据（替代清空后全量重插）
+
+        整批 COPY 到临时表后由数据库逐列比较（按列类型比较，JSONB按值比较）：
+        新合约插入、内容变化的合约更新、已下架的合约删除，未变化的行不写入。
+        同一交易所的所有变更在一个事务内完成，读者只会看到同步前或同步后的完整数据；
+        变更同时写入 contract_spec_history 规格历史
+
+        payload 为空（通常是接口失败）时跳过该交易所，避免误删全部合约
+        字段类型不匹配的行在写入前被拒绝（保留库中旧数据），批量合并失败时回退到逐行同步
+
+        Args:
+            table_name: 表名
+            contracts: 合约数据列表
+            primary_key: 主键字段名
+
+        Returns:
+            同步后表中与本次 payload 一致的合约数
+        """
+        if not contracts:
+            print(f"⚠️  {table_name}: 本次未获取到数据，跳过同步")
+            return 0
+
+        pk_column = primary_key.lower()
+
+        async with self.pool.acquire() as conn:
+            column_types = await self.ensure_columns(conn, table_name, contracts)
+            columns, records, rejects = self._prepare_rows(contracts, primary_key, column_types)
+            self._report_rejects(table_name, rejects)
+
+            if not records:
+                return 0
+
+            specs = {str(contract.get(primary_key)): contract for contract in contracts}
+            # 被拒绝的行仍在交易所上线，保留库中的旧数据，不能当作已下架删除
+            kept = [str(pk_value) for pk_value, _ in rejects if pk_value]
+
+            try:
+                async with conn.transaction():
+                    changed = await self._merge_records(
+                        conn, table_name, columns, records, primary_key, only_changed=True
+                    )
+                    # 临时表中不存在的就是已下架的合约
+                    delisted = await conn.fetch(f"""
+                        DELETE FROM {table_name} t
+                        WHERE NOT EXISTS (
+                            SELECT 1 FROM _staging_{table_name} s WHERE s.{pk_column} = t.{pk_column}
+                        )
+                          AND NOT (t.{pk_column} = ANY($1::text[]))
+                        RETURNING t.{pk_column}
+                    """, kept)
+
+                    await record_spec_changes(
+                        conn,
+                        table_name,
+                        [(row[pk_column], specs[row[pk_column]]) for row in changed],
+                        [row[pk_column] for row in delisted]
+                    )
+            except Exception as e:
+                print(f"⚠️  {table_name}: 批量同步失败 ({e})，回退到逐行同步")
+                changed, delisted = await self._sync_rows(
+                    conn, table_name, columns, records, primary_key, specs, kept
+                )
+
+        inserted = sum(1 for row in changed if row['inserted'])
+        updated = len(changed) - inserted
+        unchanged = len(records) - len(changed)
+        print(f"✅ {table_name}: 新增 {inserted}, 更新 {updated}, 删除 {len(delisted)}, 未变 {unchanged}")
+        return len(records)
+
+    async def _sync_rows(self, conn, table_name: str, columns: List[str], records: List[tuple],
+                         primary_key: str, specs: Dict[str, Dict], kept: List[str]) -> Tuple[List, List]:
+        """
+        逐行同步（sync_contracts 批量合并失败时的回退）
+
+        每行在自己的保存点内upsert，失败的行只报告错误、不影响其他行；
+        已下架合约的删除和规格历史与批量路径一致，在同一个事务内完成
+
+        Args:
+            kept: 预检查被拒绝、但仍在交易所上线的主键（不删除）
+
+        Returns:
+            (changed, delisted)
+        """
+        pk_column = primary_key.lower()
+        pk_index = columns.index(pk_column)
+        changed = []
+
+        async with conn.transaction():
+            statement = await conn.prepare(
+                self._upsert_sql(table_name, columns, pk_column, only_changed=True)
+            )
+            for record in records:
+                try:
+                    async with conn.transaction():
+                        changed.extend(await statement.fetch(*record))
+                except Exception as e:
+                    print(f"❌ 同步失败 {record[pk_index]}: {e}")
+
+            # 本次 payload 中出现的合约（包括写入失败的）都不删除
+            delisted = await conn.fetch(f"""
+                DELETE FROM {table_name}
+                WHERE NOT ({pk_column} = ANY($1::text[]))
+                RETURNING {pk_column}
+            """, [str(record[pk_index]) for record in records] + kept)
+
+            await record_spec_changes(
+                conn,
+                table_name,
+                [(row[pk_column], specs[row[pk_column]]) for row in changed],
+                [row[pk_column] for row in delisted]
+            )
+
+        return changed, delisted
+
+    async def swap_load_contracts(self, table_name: str, contracts: List[Dict], primary_key: str = 'symbol'):
+        """
+        影子表加载后原子切换
+
+        1. 按原表结构创建无索引的影子表 {table}__shadow，一次 COPY 全量写入
+        2. 加载完成后按原表的索引定义在影子表上建索引
+        3. 在一个短事务内：影子表与原表比较，变化/下架的合约写入 contract_spec_history ->
+           原表改名 -> 影子表改名为原表 -> 重建依赖视图 ->
+           转移序列归属 -> 删除旧表 -> 恢复索引/约束名称
+
+        视图与映射脚本只会看到完整的旧快照或完整的新快照。payload 为空时跳过，保留旧数据
+
+        Args:
+            table_name: 表名
+            contracts: 合约数据列表
+            primary_key: 主键字段名
+        """
+        if not contracts:
+            print(f"⚠️  {table_name}: 本次未获取到数据，跳过切换")
+            return 0
+
+        shadow = f"{table_name}__shadow"
+        old = f"{table_name}__old"
+
+        async with self.pool.acquire() as conn:
+            column_types = await self.ensure_columns(conn, table_name, contracts)
+            columns, records, rejects = self._prepare_rows(contracts, primary_key, column_types)
+            self._report_rejects(table_name, rejects)
+
+            if not records:
+                return 0
+
+            pk_column = primary_key.lower()
+            specs = {str(contract.get(primary_key)): contract for contract in contracts}
+
+            try:
+                # 影子表：只复制列和默认值，不带索引
+                await conn.execute(f"DROP TABLE IF EXISTS {shadow}")
+                await conn.execute(f"CREATE TABLE {shadow} (LIKE {table_name} INCLUDING DEFAULTS)")
+                await conn.copy_records_to_table(shadow, records=records, columns=columns)
+
+                # 加载完成后再建索引
+                indexes = await conn.fetch("""
+                    SELECT i.indexname, i.indexdef, c.conname, c.contype
+                    FROM pg_indexes i
+                    LEFT JOIN pg_constraint c
+                        ON c.conindid = format('%I.%I', i.schemaname, i.indexname)::regclass
+                       AND c.contype IN ('p', 'u')
+                    WHERE i.schemaname = current_schema() AND i.tablename = $1
+                """, table_name)
+                for index in indexes:
+                    await conn.execute(self._shadow_index_sql(index['indexdef'], index['indexname'], table_name))
+                await conn.execute(f"ANALYZE {shadow}")
+
+                # 切换前记录依赖视图定义与序列
+                views = await conn.fetch("""
+                    SELECT DISTINCT v.oid::regclass::text AS view_name, pg_get_viewdef(v.oid) AS definition
+                    FROM pg_depend d
+                    JOIN pg_rewrite r ON r.oid = d.objid
+                    JOIN pg_class v ON v.oid = r.ev_class
+                    WHERE d.refobjid = $1::regclass AND v.oid <> $1::regclass AND v.relkind = 'v'
+                """, table_name)
+                sequences = await conn.fetch("""
+                    SELECT attname, pg_get_serial_sequence($1, attname) AS sequence_name
+                    FROM pg_attribute
+                    WHERE attrelid = $1::regclass AND attnum > 0 AND NOT attisdropped
+                      AND pg_get_serial_sequence($1, attname) IS NOT NULL
+                """, table_name)
+
+                async with conn.transaction():
+                    await conn.execute("SET LOCAL lock_timeout = '10s'")
+                    # 并行切换多张表时，依赖视图会被多个事务同时重建，这里逐个串行
+                    await conn.execute("SELECT pg_advisory_xact_lock(hashtext('swap_load_contracts'))")
+
+                    # 切换前与原表比较，规格历史与切换在同一事务内提交
+                    changed, delisted = await self._diff_tables(conn, table_name, shadow, columns, pk_column)
+                    await record_spec_changes(
+                        conn, table_name, [(pk_value, specs[pk_value]) for pk_value in changed], delisted
+                    )
+
+                    await conn.execute(f"ALTER TABLE {table_name} RENAME TO {old}")
+                    await conn.execute(f"ALTER TABLE {shadow} RENAME TO {table_name}")
+
+                    # 视图按名称重建后指向新表，旧表不再被依赖
+                    for view in views:
+                        await conn.execute(f"CREATE OR REPLACE VIEW {view['view_name']} AS {view['definition']}")
+
+                    for sequence in sequences:
+                        await conn.execute(
+                            f"ALTER SEQUENCE {sequence['sequence_name']} OWNED BY {table_name}.{sequence['attname']}"
+                        )
+
+                    await conn.execute(f"DROP TABLE {old}")
+
+                    for index in indexes:
+                        shadow_index = f"{index['indexname']}__shadow"
+                        if index['contype'] == 'p':
+                            await conn.execute(
+                                f"ALTER TABLE {table_name} ADD CONSTRAINT {index['conname']} PRIMARY KEY USING INDEX {shadow_index}"
+                            )
+                        elif index['contype'] == 'u':
+                            await conn.execute(
+                                f"ALTER TABLE {table_name} ADD CONSTRAINT {index['conname']} UNIQUE USING INDEX {shadow_index}"
+                            )
+                        else:
+                            await conn.execute(f"ALTER INDEX {shadow_index} RENAME TO {index['indexname']}")
+            except Exception as e:
+                print(f"❌ {table_name}: 影子表切换失败，保留旧数据: {e}")
+                await conn.execute(f"DROP TABLE IF EXISTS {shadow}")
+                return 0
+
+        print(f"✅ {table_name}: {len(records)}/{len(contracts)} 条数据已通过影子表切换上线, "
+              f"变化 {len(changed)}, 下架 {len(delisted)}")
+        return len(records)
+
+    @staticmethod
+    def _shadow_index_sql(indexdef: str, index_name: str, table_name: str) -> str:
+        """把原表的索引定义改写为影子表上的同结构索引"""
+        shadow_def = re.sub(
+            rf'^(CREATE (?:UNIQUE )?INDEX) {re.escape(index_name)} ON (ONLY )?(\S+\.)?{re.escape(table_name)} ',
+            rf'\1 {index_name}__shadow ON \3{table_name}__shadow ',
+            indexdef
+        )
+        return shadow_def
@@ -2,9 +2,32 @@
 数据库操作模块 - JSONB存储版本
 """
 import asyncpg
-from typing import List, Dict
+from typing import List, Dict, Tuple
+import hashlib
 import json
 
+from .json_codec import register_json_codecs
+from .spec_history import create_history_table, record_spec_changes
+
+# 各交易所常用于过滤/排序的JSON键，为每个键建立 (data->>'key') 表达式B-tree索引，
+# 查询走索引查找而不是 GIN 扫描后再逐行复核；
+# 可在 config.EXCHANGES[exchange]['jsonb_index_keys'] 中覆盖
+JSONB_INDEX_KEYS = {
+    'xt': ('baseCoin', 'quoteCoin'),
+    'binance': ('baseAsset', 'quoteAsset', 'marginAsset'),
+    'okx': ('instFamily', 'settleCcy', 'ctValCcy'),
+    'bybit': ('baseCoin', 'quoteCoin', 'settleCoin'),
+    'gate': (),
+    'kucoin': ('baseCurrency', 'quoteCurrency', 'settleCurrency'),
+    'mexc': ('baseCoin', 'quoteCoin', 'settleCoin'),
+}
+
+
+def content_hash(contract: Dict) -> str:
+    """合约内容哈希（键排序后的JSON），用于判断规格是否真的变化"""
+    canonical = json.dumps(contract, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.md5(canonical.encode('utf-8')).hexdigest()
+
 
 class DatabaseManager:
     """数据库管理器"""
@@ -12,10 +35,14 @@ class DatabaseManager:
     def __init__(self, db_config: dict):
         self.db_config = db_config
         self.pool = None
+        # 批量写入时被拒绝的行 {table_name: [(主键值, 原因)]}
+        self.rejects: Dict[str, List[Tuple]] = {}
 
     async def connect(self):
         """创建数据库连接池"""
-        self.pool = await asyncpg.create_pool(**self.db_config)
+        self.pool = await asyncpg.create_pool(**self.db_config, init=register_json_codecs)
+        async with self.pool.acquire() as conn:
+            await create_history_table(conn)
         print("✅ 数据库连接成功")
 
     async def close(self):
@@ -25,7 +52,12 @@ class DatabaseManager:
             print("✅ 数据库连接已关闭")
 
     async def create_tables(self, exchanges_config: dict):
-        """创建简化的JSONB表"""
+        """
+        创建简化的JSONB表
+
+        除主键索引和 data 上的 GIN 索引外，按 JSONB_INDEX_KEYS（或交易所配置中的
+        jsonb_index_keys）为常用键建立表达式索引
+        """
         async with self.pool.acquire() as conn:
             for exchange_name, config in exchanges_config.items():
                 table_name = config['table_name']
@@ -42,20 +74,35 @@ class DatabaseManager:
                         id SERIAL PRIMARY KEY,
                         {pk_field} TEXT UNIQUE NOT NULL,
                         data JSONB NOT NULL,
+                        data_hash TEXT,
                         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                         updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                     );
 
+                    ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS data_hash TEXT;
+
                     CREATE INDEX IF NOT EXISTS idx_{table_name}_{pk_field} ON {table_name}({pk_field});
                     CREATE INDEX IF NOT EXISTS idx_{table_name}_data ON {table_name} USING GIN(data);
                 """)
 
+                index_keys = config.get('jsonb_index_keys', JSONB_INDEX_KEYS.get(exchange_name, ()))
+                for key in index_keys:
+                    await conn.execute(f"""
+                        CREATE INDEX IF NOT EXISTS idx_{table_name}_data_{key.lower()}
+                        ON {table_name} ((data->>'{key}'))
+                    """)
+
         print("✅ 数据库表结构创建成功（JSONB模式）")
 
     async def insert_contracts(self, table_name: str, contracts: List[Dict], primary_key: str = 'symbol'):
         """
         插入合约数据（JSONB模式）
 
+        内容哈希未变化的合约不重写，updated_at 只在规格真正变化时更新；
+        所有行由 executemany 复用同一个预处理语句，整批失败时逐行执行（每行一个保存点）并报告错误。
+        两种方式下实际变化的行都在同一事务内写入 contract_spec_history，
+        规格历史写入失败时整个事务回滚并抛出异常
+
         Args:
             table_name: 表名
             contracts: 合约数据列表
@@ -64,28 +111,131 @@ class DatabaseManager:
         if not contracts:
             return 0
 
-        async with self.pool.acquire() as conn:
-            success_count = 0
+        # 主键重复时保留最后一条（与批量写入一致，同一事务内同一合约只记录一个新版本）
+        rows = {}
+        for contract in contracts:
+            pk_value = contract.get(primary_key)
+            if pk_value:
+                rows[pk_value] = (pk_value, contract, content_hash(contract))
+        records = list(rows.values())
+        if not records:
+            return 0
+
+        upsert_sql = f"""
+            INSERT INTO {table_name} ({primary_key}, data, data_hash)
+            VALUES ($1, $2, $3)
+            ON CONFLICT ({primary_key}) DO UPDATE SET
+                data = EXCLUDED.data,
+                data_hash = EXCLUDED.data_hash,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE {table_name}.data_hash IS DISTINCT FROM EXCLUDED.data_hash
+            RETURNING {primary_key}
+        """
 
-            for contract in contracts:
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
                 try:
-                    pk_value = contract.get(primary_key)
-                    if not pk_value:
-                        continue
+                    async with conn.transaction():
+                        # 写入前的哈希，用于找出本次实际变化的行
+                        current = await conn.fetch(
+                            f"SELECT {primary_key}, data_hash FROM {table_name} WHERE {primary_key} = ANY($1::text[])",
+                            [str(record[0]) for record in records]
+                        )
+                        await conn.executemany(upsert_sql, records)
+                    current_hashes = {row[0]: row[1] for row in current}
+                    changed = [record for record in records if current_hashes.get(record[0]) != record[2]]
+                    success_count = len(records)
+                except Exception:
+                    statement = await conn.prepare(upsert_sql)
+                    changed = []
+                    success_count = 0
+
+                    for record in records:
+                        try:
+                            async with conn.transaction():
+                                if await statement.fetch(*record):
+                                    changed.append(record)
+                            success_count += 1
+                        except Exception as e:
+                            print(f"❌ 插入失败 {record[0]}: {e}")
+
+                await record_spec_changes(
+                    conn,
+                    table_name,
+                    [(pk_value, contract) for pk_value, contract, _ in changed]
+                )
 
-                    await conn.execute(f"""
-                        INSERT INTO {table_name} ({primary_key}, data)
-                        VALUES ($1, $2)
-                        ON CONFLICT ({primary_key}) DO UPDATE SET
-                            data = EXCLUDED.data,
-                            updated_at = CURRENT_TIMESTAMP
-                    """, pk_value, json.dumps(contract))
+            print(f"✅ {table_name}: {success_count}/{len(contracts)} 条数据插入成功")
+            return success_count
 
-                    success_count += 1
+    async def bulk_insert_contracts(self, table_name: str, contracts: List[Dict], primary_key: str = 'symbol'):
+        """
+        批量插入合约数据（COPY + 集合式upsert）
 
-                except Exception as e:
-                    print(f"❌ 插入失败 {contract.get(primary_key)}: {e}")
-                    continue
+        整个交易所的数据一次 COPY 到临时表，再用一条 INSERT ... SELECT ... ON CONFLICT
+        合并到目标表，内容哈希未变化的行跳过，实际变化的行写入 contract_spec_history。
+        缺少主键、主键重复的行记入
+        self.rejects[table_name]；批量合并失败时回退到逐行插入，由逐行插入报告每一行的错误
 
-            print(f"✅ {table_name}: {success_count}/{len(contracts)} 条数据插入成功")
-            return success_count
+        Args:
+            table_name: 表名
+            contracts: 合约数据列表
+            primary_key: 主键字段名
+        """
+        if not contracts:
+            return 0
+
+        rows = {}
+        rejects = []
+        for contract in contracts:
+            pk_value = contract.get(primary_key)
+            if not pk_value:
+                rejects.append((pk_value, '缺少主键'))
+                continue
+            if pk_value in rows:
+                rejects.append((pk_value, '主键重复，保留最后一条'))
+            rows[pk_value] = (pk_value, contract, content_hash(contract))
+
+        self.rejects[table_name] = rejects
+        for pk_value, reason in rejects:
+            print(f"❌ 插入失败 {pk_value}: {reason}")
+
+        if not rows:
+            return 0
+
+        pk_column = primary_key.lower()
+        staging = f"_staging_{table_name}"
+
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    await conn.execute(f"""
+                        CREATE TEMP TABLE {staging} ({pk_column} TEXT, data JSONB, data_hash TEXT) ON COMMIT DROP
+                    """)
+                    await conn.copy_records_to_table(
+                        staging, records=list(rows.values()), columns=[pk_column, 'data', 'data_hash']
+                    )
+                    written = await conn.fetch(f"""
+                        INSERT INTO {table_name} ({pk_column}, data, data_hash)
+                        SELECT {pk_column}, data, data_hash FROM {staging}
+                        ON CONFLICT ({pk_column}) DO UPDATE SET
+                            data = EXCLUDED.data,
+                            data_hash = EXCLUDED.data_hash,
+                            updated_at = CURRENT_TIMESTAMP
+                        WHERE {table_name}.data_hash IS DISTINCT FROM EXCLUDED.data_hash
+                        RETURNING {pk_column}
+                    """)
+                    await record_spec_changes(
+                        conn,
+                        table_name,
+                        [(row[pk_column], rows[row[pk_column]][1]) for row in written]
+                    )
+        except Exception as e:
+            print(f"⚠️  {table_name}: 批量写入失败 ({e})，回退到逐行插入")
+            return await self.insert_contracts(table_name, contracts, primary_key)
+
+        written_count = len(written)
+        success_count = len(rows)
+        print(f"✅ {table_name}: {success_count}/{len(contracts)} 条数据批量写入成功"
+              f"（实际写入 {written_count}，未变化 {success_count - written_count}）")
+        return success_count
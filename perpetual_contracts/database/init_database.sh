@@ -31,7 +31,7 @@ fi
 # 1. 创建表
 echo ""
 echo "=================================================="
-echo "步骤 1/4: 创建表结构"
+echo "步骤 1/5: 创建表结构"
 echo "=================================================="
 psql -d $DB_NAME -f "$SCRIPT_DIR/core/01_tables_schema.sql"
 echo "✓ 表创建完成"
@@ -39,7 +39,7 @@ echo "✓ 表创建完成"
 # 2. 创建统一交易信息视图
 echo ""
 echo "=================================================="
-echo "步骤 2/4: 创建统一交易信息视图"
+echo "步骤 2/5: 创建统一交易信息视图"
 echo "=================================================="
 psql -d $DB_NAME -f "$SCRIPT_DIR/core/02_unified_trading_info_view.sql"
 echo "✓ 统一交易信息视图创建完成"
@@ -47,7 +47,7 @@ echo "✓ 统一交易信息视图创建完成"
 # 3. 创建原始数据视图
 echo ""
 echo "=================================================="
-echo "步骤 3/4: 创建原始数据视图"
+echo "步骤 3/5: 创建原始数据视图"
 echo "=================================================="
 psql -d $DB_NAME -f "$SCRIPT_DIR/core/03_raw_data_view.sql"
 echo "✓ 原始数据视图创建完成"
@@ -55,11 +55,19 @@ echo "✓ 原始数据视图创建完成"
 # 4. 创建函数
 echo ""
 echo "=================================================="
-echo "步骤 4/4: 创建函数"
+echo "步骤 4/5: 创建函数"
 echo "=================================================="
 psql -d $DB_NAME -f "$SCRIPT_DIR/core/04_compare_params_function.sql"
 echo "✓ 函数创建完成"
 
+# 5. 创建物化视图
+echo ""
+echo "=================================================="
+echo "步骤 5/5: 创建物化视图"
+echo "=================================================="
+psql -d $DB_NAME -f "$SCRIPT_DIR/core/05_materialized_views.sql"
+echo "✓ 物化视图创建完成"
+
 # 验证
 echo ""
 echo "=================================================="
@@ -71,6 +79,9 @@ echo ""
 echo "视图:"
 psql -d $DB_NAME -c "\dv" -t | awk '{print "  - " $1}'
 echo ""
+echo "物化视图:"
+psql -d $DB_NAME -c "\dm" -t | awk '{print "  - " $1}'
+echo ""
 echo "函数:"
 psql -d $DB_NAME -c "\df" -t | awk '{print "  - " $1}'
 
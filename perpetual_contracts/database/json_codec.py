@@ -0,0 +1,50 @@
+"""
+asyncpg JSONB编解码
+连接建立时注册，JSONB参数直接传Python对象、查询结果直接返回Python对象；
+使用二进制格式（版本号1 + JSON文本），有 orjson 时用 orjson 序列化
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSONB_BINARY_VERSION = b'\x01'
+
+
+def dumps(value) -> bytes:
+    """序列化为JSON字节串"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # 超过64位的整数等 orjson 不支持的值交给标准库
+            pass
+    return json.dumps(value, ensure_ascii=False).encode('utf-8')
+
+
+def loads(data):
+    """反序列化JSON文本/字节串"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _encode_jsonb(value) -> bytes:
+    return JSONB_BINARY_VERSION + dumps(value)
+
+
+def _decode_jsonb(data: bytes):
+    return loads(data[1:])
+
+
+async def register_json_codecs(conn):
+    """为连接注册JSONB二进制编解码（用作 asyncpg.create_pool 的 init）"""
+    await conn.set_type_codec(
+        'jsonb',
+        schema='pg_catalog',
+        encoder=_encode_jsonb,
+        decoder=_decode_jsonb,
+        format='binary'
+    )
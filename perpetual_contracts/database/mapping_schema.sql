@@ -48,3 +48,14 @@ CREATE INDEX IF NOT EXISTS idx_pair_mappings_xt_symbol ON pair_mappings(xt_symbo
 CREATE INDEX IF NOT EXISTS idx_pair_mappings_binance ON pair_mappings(binance_symbol) WHERE binance_symbol IS NOT NULL;
 CREATE INDEX IF NOT EXISTS idx_pair_mappings_okx ON pair_mappings(okx_symbol) WHERE okx_symbol IS NOT NULL;
 CREATE INDEX IF NOT EXISTS idx_pair_mappings_bybit ON pair_mappings(bybit_symbol) WHERE bybit_symbol IS NOT NULL;
+
+-- 映射合约快照（generate_mappings.py --incremental 用）
+-- 记录上次生成映射时每个合约所属的标准化交易对，增量模式对比快照找出新上线/下线的合约
+CREATE TABLE IF NOT EXISTS mapping_contract_snapshot (
+    exchange text NOT NULL,
+    symbol text NOT NULL,
+    normalized_pair text NOT NULL,
+    updated_at timestamp without time zone DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT mapping_contract_snapshot_pkey PRIMARY KEY (exchange, symbol)
+);
@@ -0,0 +1,80 @@
+"""
+合约规格历史
+数据写入时把发生变化的合约追加到按月分区的 contract_spec_history 表
+"""
+import os
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+HISTORY_TABLE = 'contract_spec_history'
+SCHEMA_FILE = os.path.join(os.path.dirname(__file__), 'spec_history_schema.sql')
+
+
+def partition_bounds(moment: datetime) -> Tuple[datetime, datetime]:
+    """返回 moment 所在月份的分区区间 [月初, 下月初)"""
+    start = moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    if start.month == 12:
+        end = start.replace(year=start.year + 1, month=1)
+    else:
+        end = start.replace(month=start.month + 1)
+    return start, end
+
+
+async def create_history_table(conn):
+    """创建规格历史表（启动时执行一次，见 DatabaseManager.connect）"""
+    with open(SCHEMA_FILE, 'r', encoding='utf-8') as f:
+        await conn.execute(f.read())
+
+
+async def ensure_partition(conn, moment: datetime):
+    """
+    按需创建 moment 所在月份的分区
+
+    分区已存在时只做一次目录查询；不存在时才按分区名加事务级咨询锁再建表，
+    只有每月第一次写入的并行事务之间会互相等待
+    """
+    start, end = partition_bounds(moment)
+    partition = f"{HISTORY_TABLE}_y{start.year}m{start.month:02d}"
+
+    if await conn.fetchval("SELECT to_regclass($1) IS NOT NULL", partition):
+        return
+
+    await conn.execute("SELECT pg_advisory_xact_lock(hashtext($1))", partition)
+    await conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {partition}
+        PARTITION OF {HISTORY_TABLE}
+        FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')
+    """)
+
+
+async def record_spec_changes(conn, source_table: str, changed: List[Tuple[str, Dict]], delisted: List[str] = ()):
+    """
+    记录合约规格变化（在写入数据的同一事务内调用，历史表需已由 create_history_table 创建）
+
+    变化的合约：关闭当前版本（valid_to），追加新版本；
+    下架的合约：只关闭当前版本
+
+    Args:
+        conn: 数据库连接
+        source_table: 来源原始表名
+        changed: [(主键, 规格数据)]，包括新上线的合约
+        delisted: 已下架合约的主键
+    """
+    if not changed and not delisted:
+        return
+
+    # 与数据表 updated_at 使用同一事务时间
+    changed_at = await conn.fetchval("SELECT LOCALTIMESTAMP")
+    await ensure_partition(conn, changed_at)
+
+    closing = [symbol for symbol, _ in changed] + list(delisted)
+    await conn.execute(f"""
+        UPDATE {HISTORY_TABLE}
+        SET valid_to = $3
+        WHERE source_table = $1 AND symbol = ANY($2::text[]) AND valid_to IS NULL
+    """, source_table, closing, changed_at)
+
+    await conn.executemany(f"""
+        INSERT INTO {HISTORY_TABLE} (source_table, symbol, spec, valid_from)
+        VALUES ($1, $2, $3::jsonb, $4)
+    """, [(source_table, symbol, spec, changed_at) for symbol, spec in changed])
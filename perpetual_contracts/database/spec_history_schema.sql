@@ -0,0 +1,31 @@
+-- 合约规格历史表 Schema
+-- 每次合约规格变化追加一行，valid_from / valid_to 表示该版本的有效区间（valid_to 为空表示当前版本）
+-- 按 valid_from 按月分区，分区由 database/spec_history.py 在写入时按需创建
+
+CREATE TABLE IF NOT EXISTS contract_spec_history (
+    source_table text NOT NULL,
+    symbol text NOT NULL,
+    spec jsonb NOT NULL,
+    valid_from timestamp without time zone NOT NULL,
+    valid_to timestamp without time zone,
+
+    CONSTRAINT contract_spec_history_pkey PRIMARY KEY (source_table, symbol, valid_from)
+) PARTITION BY RANGE (valid_from);
+
+-- 当前版本查找（关闭旧版本时使用）
+CREATE INDEX IF NOT EXISTS idx_spec_history_current
+    ON contract_spec_history (source_table, symbol) WHERE valid_to IS NULL;
+
+-- 添加注释
+COMMENT ON TABLE contract_spec_history IS '合约规格历史表 - 每次规格变化一行，按月分区';
+COMMENT ON COLUMN contract_spec_history.source_table IS '来源原始表（如 binance_perpetual）';
+COMMENT ON COLUMN contract_spec_history.spec IS '该版本的完整API原始数据';
+COMMENT ON COLUMN contract_spec_history.valid_to IS '版本失效时间，NULL 表示当前版本';
+
+-- 查询示例：某合约在指定时刻的规格
+-- SELECT spec
+-- FROM contract_spec_history
+-- WHERE source_table = 'binance_perpetual'
+--   AND symbol = 'BTCUSDT'
+--   AND valid_from <= '2026-10-01 00:00:00'
+--   AND (valid_to IS NULL OR valid_to > '2026-10-01 00:00:00');
@@ -23,22 +23,29 @@ echo "=================================================="
 
 # 1. 更新统一交易信息视图
 echo ""
-echo "步骤 1/2: 更新统一交易信息视图"
+echo "步骤 1/3: 更新统一交易信息视图"
 psql -d $DB_NAME -f "$SCRIPT_DIR/core/02_unified_trading_info_view.sql"
 echo "✓ 统一交易信息视图更新完成"
 
 # 2. 更新原始数据视图
 echo ""
-echo "步骤 2/2: 更新原始数据视图"
+echo "步骤 2/3: 更新原始数据视图"
 psql -d $DB_NAME -f "$SCRIPT_DIR/core/03_raw_data_view.sql"
 echo "✓ 原始数据视图更新完成"
 
+# 3. 重建物化视图（02 重建视图时会级联删除物化视图）
+echo ""
+echo "步骤 3/3: 重建物化视图"
+psql -d $DB_NAME -f "$SCRIPT_DIR/core/05_materialized_views.sql"
+echo "✓ 物化视图重建完成"
+
 # 验证
 echo ""
 echo "=================================================="
 echo "当前视图列表:"
 echo "=================================================="
 psql -d $DB_NAME -c "\dv"
+psql -d $DB_NAME -c "\dm"
 
 echo ""
 echo "=================================================="
@@ -8,6 +8,7 @@ from .bybit import BybitAPI
 from .gate import GateAPI
 from .kucoin import KuCoinAPI
 from .mexc import MEXCAPI
+from .fetcher import EXCHANGE_APIS, fetch_all_perpetuals
 
 __all__ = [
     'BinanceAPI',
@@ -16,5 +17,7 @@ __all__ = [
     'BybitAPI',
     'GateAPI',
     'KuCoinAPI',
-    'MEXCAPI'
+    'MEXCAPI',
+    'EXCHANGE_APIS',
+    'fetch_all_perpetuals'
 ]
@@ -1,9 +1,11 @@
 """
 交易所API基类
 """
-import requests
-from typing import List, Dict
+import asyncio
+import aiohttp
+from typing import List, Dict, Callable, Optional, AsyncIterator
 from abc import ABC, abstractmethod
+from utils.http_client import get_http_session
 
 
 class BaseExchange(ABC):
@@ -14,16 +16,76 @@ class BaseExchange(ABC):
         self.timeout = timeout
 
     @abstractmethod
-    def get_perpetuals(self) -> List[Dict]:
+    async def get_perpetuals(self) -> List[Dict]:
         """获取永续合约列表 - 返回原始API数据"""
         pass
 
-    def _get(self, url: str, params: dict = None) -> dict:
-        """发送GET请求"""
+    async def fetch_perpetuals(self) -> List[Dict]:
+        """
+        在超时限制内获取永续合约列表
+        超时或出错时返回空列表，不影响其他交易所
+        """
+        name = self.__class__.__name__
         try:
-            response = requests.get(url, params=params, timeout=self.timeout)
-            response.raise_for_status()
-            return response.json()
+            return await asyncio.wait_for(self.get_perpetuals(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            print(f"❌ {name}: 获取超时 ({self.timeout}s)")
+        except Exception as e:
+            print(f"❌ {name}: 获取失败: {e}")
+        return []
+
+    async def _get(self, url: str, params: dict = None) -> dict:
+        """发送GET请求（共享连接池）"""
+        try:
+            session = get_http_session()
+            timeout = aiohttp.ClientTimeout(total=self.timeout)
+            async with session.get(url, params=params, timeout=timeout) as response:
+                response.raise_for_status()
+                return await response.json(content_type=None)
         except Exception as e:
             print(f"❌ API请求失败 {url}: {e}")
             return {}
+
+    async def _get_pages(self, url: str, params: dict,
+                         next_cursor: Callable[[dict], Optional[str]],
+                         cursor_param: str = 'cursor',
+                         max_pages: int = 50) -> AsyncIterator[dict]:
+        """
+        按游标分页获取（nextPageCursor 风格）
+
+        拿到当前页的游标后立即发起下一页请求，调用方解析当前页时下一页已在传输中。
+        请求失败的页会原样返回（空字典）并结束分页，由调用方决定如何处理；
+        max_pages 限制最大页数，整体耗时仍受 fetch_perpetuals 的超时约束
+
+        Args:
+            url: 请求地址
+            params: 首页请求参数
+            next_cursor: 从响应中提取下一页游标，没有下一页时返回空值
+            cursor_param: 游标的请求参数名
+            max_pages: 最大页数
+        """
+        page_params = dict(params or {})
+        pending = asyncio.ensure_future(self._get(url, page_params))
+        seen_cursors = set()
+
+        try:
+            for page in range(1, max_pages + 1):
+                data = await pending
+                pending = None
+
+                cursor = next_cursor(data) if data else None
+                if cursor and cursor not in seen_cursors:
+                    if page < max_pages:
+                        seen_cursors.add(cursor)
+                        page_params = {**page_params, cursor_param: cursor}
+                        pending = asyncio.ensure_future(self._get(url, page_params))
+                    else:
+                        print(f"⚠️  {self.__class__.__name__}: 达到最大页数 {max_pages}，数据可能不完整")
+
+                yield data
+
+                if pending is None:
+                    return
+        finally:
+            if pending is not None:
+                pending.cancel()
@@ -8,13 +8,13 @@ from .base import BaseExchange
 class BinanceAPI(BaseExchange):
     """Binance 永续合约API"""
 
-    def get_perpetuals(self) -> List[Dict]:
+    async def get_perpetuals(self) -> List[Dict]:
         """
         获取Binance永续合约列表
         返回原始API数据
         """
         url = f"{self.api_base}/fapi/v1/exchangeInfo"
-        data = self._get(url)
+        data = await self._get(url)
 
         if not data:
             return []
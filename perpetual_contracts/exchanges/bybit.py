@@ -1,44 +1,58 @@
 """
 Bybit API 客户端
 """
-from typing import List, Dict
+from typing import List, Dict, Optional
 from .base import BaseExchange
 
 
 class BybitAPI(BaseExchange):
     """Bybit 永续合约API"""
 
-    def get_perpetuals(self) -> List[Dict]:
+    # 单页最大条数（接口上限1000）
+    PAGE_LIMIT = 1000
+
+    @staticmethod
+    def _next_cursor(data: dict) -> Optional[str]:
+        """提取下一页游标，最后一页为空字符串"""
+        if data.get('retCode') != 0:
+            return None
+        return data.get('result', {}).get('nextPageCursor') or None
+
+    async def get_perpetuals(self) -> List[Dict]:
         """
         获取Bybit永续合约列表
         返回原始API数据
+
+        instruments-info 接口按游标分页，需要翻完所有页才能拿到完整的合约列表
         """
         url = f"{self.api_base}/v5/market/instruments-info"
-        params = {'category': 'linear'}
-        data = self._get(url, params)
-
-        if not data or data.get('retCode') != 0:
-            return []
+        params = {'category': 'linear', 'limit': self.PAGE_LIMIT}
 
         contracts = []
         month_names = ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN',
                        'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']
 
-        for item in data.get('result', {}).get('list', []):
-            # 只获取USDT和USDC的合约
-            if item.get('quoteCoin') not in ['USDT', 'USDC']:
-                continue
+        async for data in self._get_pages(url, params, self._next_cursor):
+            # 任何一页失败都放弃本次结果，避免写入不完整的合约列表
+            if not data or data.get('retCode') != 0:
+                print("❌ Bybit: 分页获取失败")
+                return []
+
+            for item in data.get('result', {}).get('list', []):
+                # 只获取USDT和USDC的合约
+                if item.get('quoteCoin') not in ['USDT', 'USDC']:
+                    continue
 
-            # 过滤掉日期合约（只保留永续合约）
-            symbol = item.get('symbol', '')
-            if any(month in symbol for month in month_names):
-                continue
+                # 过滤掉日期合约（只保留永续合约）
+                symbol = item.get('symbol', '')
+                if any(month in symbol for month in month_names):
+                    continue
 
-            # 只保留状态为Trading的合约
-            if item.get('status') != 'Trading':
-                continue
+                # 只保留状态为Trading的合约
+                if item.get('status') != 'Trading':
+                    continue
 
-            contracts.append(item)
+                contracts.append(item)
 
         print(f"✅ Bybit: {len(contracts)} 个合约 (已过滤非活跃合约)")
         return contracts
@@ -0,0 +1,49 @@
+"""
+并发获取所有交易所的永续合约数据
+"""
+import asyncio
+from typing import List, Dict
+from .binance import BinanceAPI
+from .xt import XTAPI
+from .okx import OKXAPI
+from .bybit import BybitAPI
+from .gate import GateAPI
+from .kucoin import KuCoinAPI
+from .mexc import MEXCAPI
+
+
+# 交易所名称 -> API类（顺序即 exchanges_data 的键顺序）
+EXCHANGE_APIS = {
+    'binance': BinanceAPI,
+    'xt': XTAPI,
+    'okx': OKXAPI,
+    'bybit': BybitAPI,
+    'gate': GateAPI,
+    'kucoin': KuCoinAPI,
+    'mexc': MEXCAPI,
+}
+
+
+async def fetch_all_perpetuals(exchanges_config: Dict[str, dict], timeout: int = 10) -> Dict[str, List[Dict]]:
+    """
+    并发获取所有交易所的永续合约
+
+    每个交易所使用独立的超时（exchanges_config[name]['timeout']，默认为timeout），
+    总耗时约等于最慢的单个交易所；超时或失败的交易所返回空列表
+
+    Args:
+        exchanges_config: {exchange_name: {'api_base': ..., 'table_name': ..., ['timeout': ...]}}
+        timeout: 默认超时（秒）
+
+    Returns:
+        {exchange_name: [contracts]}
+    """
+    names = [name for name in EXCHANGE_APIS if name in exchanges_config]
+    apis = [
+        EXCHANGE_APIS[name](exchanges_config[name]['api_base'],
+                            exchanges_config[name].get('timeout', timeout))
+        for name in names
+    ]
+
+    results = await asyncio.gather(*(api.fetch_perpetuals() for api in apis))
+    return dict(zip(names, results))
@@ -8,13 +8,13 @@ from .base import BaseExchange
 class GateAPI(BaseExchange):
     """Gate.io 永续合约API"""
 
-    def get_perpetuals(self) -> List[Dict]:
+    async def get_perpetuals(self) -> List[Dict]:
         """
         获取Gate.io永续合约列表
         返回原始API数据
         """
         url = f"{self.api_base}/api/v4/futures/usdt/contracts"
-        data = self._get(url)
+        data = await self._get(url)
 
         if not isinstance(data, list):
             return []
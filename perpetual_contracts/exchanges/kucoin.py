@@ -8,13 +8,13 @@ from .base import BaseExchange
 class KuCoinAPI(BaseExchange):
     """KuCoin 永续合约API"""
 
-    def get_perpetuals(self) -> List[Dict]:
+    async def get_perpetuals(self) -> List[Dict]:
         """
         获取KuCoin永续合约列表
         返回原始API数据
         """
         url = f"{self.api_base}/api/v1/contracts/active"
-        data = self._get(url)
+        data = await self._get(url)
 
         if not data or data.get('code') != '200000':
             return []
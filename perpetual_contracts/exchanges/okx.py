@@ -8,14 +8,14 @@ from .base import BaseExchange
 class OKXAPI(BaseExchange):
     """OKX 永续合约API"""
 
-    def get_perpetuals(self) -> List[Dict]:
+    async def get_perpetuals(self) -> List[Dict]:
         """
         获取OKX永续合约列表
         返回原始API数据
         """
         url = f"{self.api_base}/api/v5/public/instruments"
         params = {'instType': 'SWAP'}
-        data = self._get(url, params)
+        data = await self._get(url, params)
 
         if not data or data.get('code') != '0':
             return []
@@ -8,13 +8,13 @@ from .base import BaseExchange
 class XTAPI(BaseExchange):
     """XT 永续合约API"""
 
-    def get_perpetuals(self) -> List[Dict]:
+    async def get_perpetuals(self) -> List[Dict]:
         """
         获取XT永续合约列表
         返回原始API数据
         """
         url = f"{self.api_base}/future/market/v1/public/symbol/list"
-        data = self._get(url)
+        data = await self._get(url)
 
         if not data or data.get('returnCode') != 0:
             return []
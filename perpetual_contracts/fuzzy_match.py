@@ -4,20 +4,83 @@
 """
 import asyncio
 import asyncpg
+import os
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List, Tuple, Optional
 from config import DB_CONFIG
 from utils.price_fetcher import PriceFetcher
+from utils.http_client import close_http_session
 from utils.pair_mapping import is_price_match
 
-
-def string_similarity(s1: str, s2: str) -> float:
+# 模糊匹配搜索的交易所及其原始表（XT 为查询方，不在其中）
+#   symbol: 交易对字段
+#   base/quote: base/quote 字段；没有单独字段的交易所用 sep 从交易对中拆分
+#   （OKX 为 BTC-USDT-SWAP，Gate 为 BTC_USDT）
+EXCHANGE_TABLES = {
+    'binance': {'table': 'binance_perpetual', 'symbol': 'symbol', 'base': 'baseasset', 'quote': 'quoteasset'},
+    'okx': {'table': 'okx_perpetual', 'symbol': 'instid', 'sep': '-'},
+    'bybit': {'table': 'bybit_perpetual', 'symbol': 'symbol', 'base': 'basecoin', 'quote': 'quotecoin'},
+    'gate': {'table': 'gate_perpetual', 'symbol': 'name', 'sep': '_'},
+    'kucoin': {'table': 'kucoin_perpetual', 'symbol': 'symbol', 'base': 'basecurrency', 'quote': 'quotecurrency'},
+    'mexc': {'table': 'mexc_perpetual', 'symbol': 'symbol', 'base': 'basecoin', 'quote': 'quotecoin'},
+}
+
+
+def _char_masks(pattern: str) -> Dict[str, int]:
+    """位并行编辑距离的字符位掩码：每个字符在 pattern 中出现位置的比特位"""
+    masks = {}
+    bit = 1
+    for c in pattern:
+        masks[c] = masks.get(c, 0) | bit
+        bit <<= 1
+    return masks
+
+
+def _edit_distance(pattern: str, masks: Dict[str, int], text: str,
+                   max_distance: Optional[int] = None) -> Optional[int]:
     """
-    计算两个字符串的相似度（使用简单的包含关系）
+    位并行编辑距离（Myers/Hyyrö），一个整数的比特位代表 DP 表的一整列
 
-    Returns:
-        float: 相似度分数 (0.0 - 1.0)
+    给定 max_distance 时，一旦剩余字符不足以把距离降到 max_distance 以内就提前返回 None
     """
-    s1_lower = s1.lower()
+    m, n = len(pattern), len(text)
+    if m == 0:
+        return n if max_distance is None or n <= max_distance else None
+    if max_distance is not None and abs(m - n) > max_distance:
+        return None
+
+    full = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv, mv, score = full, 0, m
+
+    for j, c in enumerate(text, 1):
+        eq = masks.get(c, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & full)
+        mh = pv & xh
+
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+
+        # 第0行每列加1（全局编辑距离）
+        ph = ((ph << 1) | 1) & full
+        mh = (mh << 1) & full
+        pv = mh | (~(xv | ph) & full)
+        mv = ph & xv
+
+        # 每多读一个字符距离最多减1
+        if max_distance is not None and score - (n - j) > max_distance:
+            return None
+
+    return score
+
+
+def _similarity(s1_lower: str, s1_clean: str, masks: Dict[str, int], s2: str,
+                threshold: Optional[float]) -> float:
+    """string_similarity 的实现，s1 的预处理结果可在多次比较间复用"""
     s2_lower = s2.lower()
 
     # 完全相同
@@ -25,7 +88,6 @@ def string_similarity(s1: str, s2: str) -> float:
         return 1.0
 
     # 其中一个包含另一个（去掉数字后缀）
-    s1_clean = ''.join(c for c in s1_lower if not c.isdigit())
     s2_clean = ''.join(c for c in s2_lower if not c.isdigit())
 
     if s1_clean == s2_clean:
@@ -38,41 +100,265 @@ def string_similarity(s1: str, s2: str) -> float:
         return shorter / longer * 0.9
 
     # 计算 Levenshtein distance
-    # 使用动态规划计算编辑距离
     if len(s1_clean) == 0 or len(s2_clean) == 0:
         return 0.0
 
-    m, n = len(s1_clean), len(s2_clean)
-    dp = [[0] * (n + 1) for _ in range(m + 1)]
-
-    for i in range(m + 1):
-        dp[i][0] = i
-    for j in range(n + 1):
-        dp[0][j] = j
-
-    for i in range(1, m + 1):
-        for j in range(1, n + 1):
-            cost = 0 if s1_clean[i-1] == s2_clean[j-1] else 1
-            dp[i][j] = min(
-                dp[i-1][j] + 1,      # deletion
-                dp[i][j-1] + 1,      # insertion
-                dp[i-1][j-1] + cost  # substitution
-            )
-
-    edit_distance = dp[m][n]
-    max_len = max(m, n)
+    max_len = max(len(s1_clean), len(s2_clean))
+    max_distance = None
+    if threshold is not None:
+        max_distance = int((1 - threshold) * max_len + 1e-9)
+
+    edit_distance = _edit_distance(s1_clean, masks, s2_clean, max_distance)
+    if edit_distance is None:
+        return 0.0
+
     similarity = 1 - (edit_distance / max_len)
 
     return max(0.0, similarity)
 
 
-async def find_fuzzy_matches(pool, similarity_threshold: float = 0.7) -> List[Dict]:
+def string_similarity(s1: str, s2: str, threshold: Optional[float] = None) -> float:
+    """
+    计算两个字符串的相似度（使用简单的包含关系）
+
+    Args:
+        s1, s2: 待比较的字符串
+        threshold: 相似度阈值，给定时编辑距离超出阈值允许范围后提前结束并返回 0.0；
+                   达到阈值的得分与不给阈值时完全相同
+
+    Returns:
+        float: 相似度分数 (0.0 - 1.0)
+    """
+    s1_lower = s1.lower()
+    s1_clean = ''.join(c for c in s1_lower if not c.isdigit())
+    return _similarity(s1_lower, s1_clean, _char_masks(s1_clean), s2, threshold)
+
+
+def string_similarity_batch(query: str, candidates: List[str],
+                            threshold: Optional[float] = None) -> List[float]:
+    """
+    计算一个字符串与多个候选的相似度，query 的预处理（小写、去数字、位掩码）只做一次
+
+    Returns:
+        与 candidates 一一对应的相似度分数，语义同 string_similarity
+    """
+    query_lower = query.lower()
+    query_clean = ''.join(c for c in query_lower if not c.isdigit())
+    masks = _char_masks(query_clean)
+    return [_similarity(query_lower, query_clean, masks, c, threshold) for c in candidates]
+
+
+def _clean_base(base: str) -> str:
+    """相似度计算使用的形式：小写并去掉数字"""
+    return ''.join(c for c in base.lower() if not c.isdigit())
+
+
+class BaseAssetIndex:
+    """
+    模糊匹配候选索引
+
+    按 quote 分区，对去掉数字后的 base（首尾加边界符）建立 bigram 倒排索引和长度分桶。
+    查询时根据相似度阈值推导出候选必须满足的长度范围和最少共享 bigram 数，
+    只返回有可能达到阈值的候选，不会漏掉任何能通过 string_similarity 阈值的候选：
+
+    - 长度：包含关系和编辑距离两种得分都要求 短/长 >= 阈值
+    - 编辑距离 d <= (1 - 阈值) * 较长长度，每次编辑最多破坏 q 个 gram，
+      因此至少共享 |G(query)| - d * q 个不同的 gram
+    - 包含关系：较短一方除两个边界 gram 外的所有 gram 都出现在较长一方
+    """
+
+    def __init__(self, q: int = 2):
+        self.q = q
+        self._items = []           # 按加入顺序保存的候选
+        self._partitions = {}      # {QUOTE: _Partition}
+
+    class _Partition:
+        def __init__(self):
+            self.keys = {}         # clean_base -> key_id
+            self.cleans = []       # key_id -> clean_base
+            self.inner_counts = [] # key_id -> 不含边界符的不同gram数
+            self.item_ids = []     # key_id -> [item_id]
+            self.postings = {}     # gram -> [key_id]
+            self.by_length = {}    # 长度 -> [key_id]
+
+    def _grams(self, text: str) -> set:
+        """首尾加边界符后的不同 gram 集合（短字符串也能得到有效的过滤条件）"""
+        q = self.q
+        padded = '\x02' + text + '\x03'
+        return {padded[i:i + q] for i in range(len(padded) - q + 1)}
+
+    def add(self, base: str, quote: str, item):
+        """加入一个候选，item 为查询时原样返回的数据"""
+        partition = self._partitions.get(quote.upper())
+        if partition is None:
+            partition = self._partitions[quote.upper()] = self._Partition()
+
+        item_id = len(self._items)
+        self._items.append(item)
+
+        clean = _clean_base(base)
+        key_id = partition.keys.get(clean)
+        if key_id is None:
+            key_id = len(partition.cleans)
+            partition.keys[clean] = key_id
+            partition.cleans.append(clean)
+            partition.item_ids.append([])
+
+            grams = self._grams(clean)
+            partition.inner_counts.append(len(grams) - 2)
+            for gram in grams:
+                partition.postings.setdefault(gram, []).append(key_id)
+            partition.by_length.setdefault(len(clean), []).append(key_id)
+
+        partition.item_ids[key_id].append(item_id)
+
+    def _edit_required(self, query_len: int, query_grams: int, length: int,
+                       threshold: float) -> int:
+        """按编辑距离得分，长度为 length 的候选至少需要与查询共享的 gram 数"""
+        max_distance = int((1 - threshold) * max(query_len, length) + 1e-9)
+        return query_grams - max_distance * self.q
+
+    @staticmethod
+    def _containment_possible(query_len: int, length: int, threshold: float) -> bool:
+        """长度不同且按包含关系得分（短/长 * 0.9）可能达到阈值"""
+        if query_len == length:
+            return False
+        return min(query_len, length) * 0.9 >= threshold * max(query_len, length) - 1e-9
+
+    def candidates(self, base: str, quote: str, threshold: float) -> List:
+        """返回可能达到相似度阈值的候选（按加入顺序）"""
+        partition = self._partitions.get(quote.upper())
+        if partition is None:
+            return []
+
+        if threshold <= 0:
+            return [self._items[i] for ids in partition.item_ids for i in ids]
+
+        clean = _clean_base(base)
+        m = len(clean)
+        grams = self._grams(clean)
+        query_inner = len(grams) - 2
+
+        # 统计与查询共享的 gram 数
+        shared = {}
+        for gram in grams:
+            for key_id in partition.postings.get(gram, ()):
+                shared[key_id] = shared.get(key_id, 0) + 1
+
+        # 长度范围: 短/长 >= 阈值
+        min_len = int(m * threshold - 1e-9) if m else 0
+        max_len = int(m / threshold + 1e-9) if m else 0
+        edit_required = {
+            length: self._edit_required(m, len(grams), length, threshold)
+            for length in range(max(min_len, 0), max_len + 1)
+        }
+
+        key_ids = set()
+
+        # 下限不大于0的长度桶无法过滤，整桶作为候选
+        for length, required in edit_required.items():
+            bucket = partition.by_length.get(length)
+            if not bucket:
+                continue
+            if required <= 0 or (self._containment_possible(m, length, threshold)
+                                 and (query_inner <= 0 if m < length else length < self.q)):
+                key_ids.update(bucket)
+
+        for key_id, count in shared.items():
+            length = len(partition.cleans[key_id])
+            required = edit_required.get(length)
+            if required is None:
+                continue
+            if count >= required:
+                key_ids.add(key_id)
+            elif self._containment_possible(m, length, threshold):
+                # 较短一方的内部 gram 必须全部共享
+                inner = query_inner if m < length else partition.inner_counts[key_id]
+                if count >= inner:
+                    key_ids.add(key_id)
+
+        # 去掉数字后完全相同的 base 必须返回（得分 >= 0.95）
+        exact = partition.keys.get(clean)
+        if exact is not None:
+            key_ids.add(exact)
+
+        item_ids = sorted(i for k in key_ids for i in partition.item_ids[k])
+        return [self._items[i] for i in item_ids]
+
+
+def _match_pairs(index: BaseAssetIndex, xt_pairs: List[Tuple[str, str, str]],
+                 similarity_threshold: float) -> List[Dict]:
+    """
+    对一批 XT 交易对查找模糊匹配候选（纯CPU计算）
+
+    Args:
+        index: 候选索引
+        xt_pairs: [(xt_symbol, xt_base, xt_quote), ...]
+        similarity_threshold: 字符串相似度阈值
+    """
+    fuzzy_candidates = []
+
+    for xt_symbol, xt_base, xt_quote in xt_pairs:
+        candidates = {
+            'xt_symbol': xt_symbol,
+            'xt_base': xt_base,
+            'xt_quote': xt_quote,
+            'matches': []
+        }
+
+        entries = index.candidates(xt_base, xt_quote, similarity_threshold)
+        scores = string_similarity_batch(xt_base, [e['base'] for e in entries], similarity_threshold)
+        for entry, similarity in zip(entries, scores):
+            if similarity >= similarity_threshold:
+                candidates['matches'].append({**entry, 'similarity': similarity})
+
+        # 只保留有匹配的候选
+        if candidates['matches']:
+            fuzzy_candidates.append(candidates)
+
+    return fuzzy_candidates
+
+
+# 子进程内的候选索引和阈值（由 _init_worker 在进程启动时设置一次）
+_worker_index: Optional[BaseAssetIndex] = None
+_worker_threshold: float = 0.0
+
+
+def _init_worker(entries: List[Tuple[str, str, Dict]], similarity_threshold: float):
+    """进程池初始化：在子进程中建立候选索引"""
+    global _worker_index, _worker_threshold
+
+    _worker_index = BaseAssetIndex()
+    for base, quote, item in entries:
+        _worker_index.add(base, quote, item)
+    _worker_threshold = similarity_threshold
+
+
+def _match_shard(xt_pairs: List[Tuple[str, str, str]]) -> List[Dict]:
+    """子进程中处理一个分片"""
+    return _match_pairs(_worker_index, xt_pairs, _worker_threshold)
+
+
+def _split_symbol(symbol: str, sep: str) -> Tuple[Optional[str], Optional[str]]:
+    """从 BTC-USDT-SWAP / BTC_USDT 形式的交易对中拆出 base 和 quote"""
+    parts = (symbol or '').split(sep)
+    if len(parts) < 2:
+        return None, None
+    return parts[0], parts[1]
+
+
+async def find_fuzzy_matches(pool, similarity_threshold: float = 0.7,
+                             workers: Optional[int] = None) -> List[Dict]:
     """
     查找所有需要模糊匹配的交易对
 
+    在 EXCHANGE_TABLES 中除XT外的全部交易所中查找候选；相似度计算按 XT 交易对分片，
+    在进程池中并行执行，事件循环不被CPU计算阻塞
+
     Args:
         pool: 数据库连接池
         similarity_threshold: 字符串相似度阈值
+        workers: 进程数（默认为CPU核数，1表示在当前进程中计算）
 
     Returns:
         List of fuzzy match candidates
@@ -91,116 +377,73 @@ async def find_fuzzy_matches(pool, similarity_threshold: float = 0.7) -> List[Di
             WHERE pm.xt_symbol IS NULL
         """)
 
-        # 部分映射的 XT 交易对（可能能找到更多匹配）
+        # 部分映射的 XT 交易对（可能能找到更多匹配）：
+        # exchange_count 包含XT本身，少于 1 + 搜索的交易所数 即还有交易所没有映射上
         partial_mapped = await conn.fetch("""
             SELECT xt.symbol, xt.basecoin, xt.quotecoin
             FROM xt_perpetual xt
             JOIN pair_mappings pm ON xt.symbol = pm.xt_symbol
-            WHERE pm.exchange_count < 4  -- 映射到的交易所少于4个
-        """)
+            WHERE pm.exchange_count < $1
+        """, len(EXCHANGE_TABLES) + 1)
 
     xt_pairs = list(unmapped_xt) + list(partial_mapped)
     print(f"   找到 {len(unmapped_xt)} 个未映射 + {len(partial_mapped)} 个部分映射的 XT 交易对")
     print()
 
-    # 2. 获取各交易所的合约
+    # 2. 获取各交易所的合约，整理为候选 (base, quote, item)
+    entries = []
     async with pool.acquire() as conn:
-        binance_contracts = await conn.fetch("""
-            SELECT symbol, baseasset, quoteasset
-            FROM binance_perpetual
-        """)
-
-        okx_contracts = await conn.fetch("""
-            SELECT instid as symbol
-            FROM okx_perpetual
-        """)
-
-        bybit_contracts = await conn.fetch("""
-            SELECT symbol, basecoin, quotecoin
-            FROM bybit_perpetual
-        """)
-
-        gate_contracts = await conn.fetch("""
-            SELECT name as symbol
-            FROM gate_perpetual
-        """)
-
-        kucoin_contracts = await conn.fetch("""
-            SELECT symbol, basecurrency, quotecurrency
-            FROM kucoin_perpetual
-        """)
-
-        mexc_contracts = await conn.fetch("""
-            SELECT symbol, basecoin, quotecoin
-            FROM mexc_perpetual
-        """)
-
-    print(f"   加载了各交易所的合约数据")
+        for exchange, source in EXCHANGE_TABLES.items():
+            if 'sep' in source:
+                contracts = await conn.fetch(f"""
+                    SELECT {source['symbol']} AS symbol
+                    FROM {source['table']}
+                """)
+            else:
+                contracts = await conn.fetch(f"""
+                    SELECT {source['symbol']} AS symbol, {source['base']} AS base, {source['quote']} AS quote
+                    FROM {source['table']}
+                """)
+
+            for contract in contracts:
+                if 'sep' in source:
+                    base, quote = _split_symbol(contract['symbol'], source['sep'])
+                else:
+                    base, quote = contract['base'], contract['quote']
+                if base and quote:
+                    entries.append((base, quote, {
+                        'exchange': exchange,
+                        'symbol': contract['symbol'],
+                        'base': base,
+                        'quote': quote,
+                    }))
+
+    print(f"   加载了 {len(EXCHANGE_TABLES)} 个交易所的 {len(entries)} 个合约")
     print()
 
-    # 3. 对每个 XT 交易对，查找模糊匹配
-    fuzzy_candidates = []
-
-    for xt_pair in xt_pairs:
-        xt_symbol = xt_pair['symbol']
-        xt_base = xt_pair['basecoin']
-        xt_quote = xt_pair['quotecoin']
-
-        candidates = {
-            'xt_symbol': xt_symbol,
-            'xt_base': xt_base,
-            'xt_quote': xt_quote,
-            'matches': []
-        }
-
-        # 在 Binance 中查找
-        for bn in binance_contracts:
-            if bn['quoteasset'].upper() != xt_quote.upper():
-                continue
-
-            similarity = string_similarity(xt_base, bn['baseasset'])
-            if similarity >= similarity_threshold:
-                candidates['matches'].append({
-                    'exchange': 'binance',
-                    'symbol': bn['symbol'],
-                    'base': bn['baseasset'],
-                    'quote': bn['quoteasset'],
-                    'similarity': similarity
-                })
-
-        # 在 Bybit 中查找
-        for bb in bybit_contracts:
-            if bb['quotecoin'].upper() != xt_quote.upper():
-                continue
-
-            similarity = string_similarity(xt_base, bb['basecoin'])
-            if similarity >= similarity_threshold:
-                candidates['matches'].append({
-                    'exchange': 'bybit',
-                    'symbol': bb['symbol'],
-                    'base': bb['basecoin'],
-                    'quote': bb['quotecoin'],
-                    'similarity': similarity
-                })
-
-        # 在 MEXC 中查找
-        for mx in mexc_contracts:
-            if mx['quotecoin'].upper() != xt_quote.upper():
-                continue
-
-            similarity = string_similarity(xt_base, mx['basecoin'])
-            if similarity >= similarity_threshold:
-                candidates['matches'].append({
-                    'exchange': 'mexc',
-                    'symbol': mx['symbol'],
-                    'base': mx['basecoin'],
-                    'quote': mx['quotecoin'],
-                    'similarity': similarity
-                })
-
-        # 只保留有匹配的候选
-        if candidates['matches']:
-            fuzzy_candidates.append(candidates)
+    # 3. 分片并行计算相似度
+    pairs = [(p['symbol'], p['basecoin'], p['quotecoin']) for p in xt_pairs]
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, max(1, len(pairs)))
+
+    if workers <= 1:
+        index = BaseAssetIndex()
+        for base, quote, item in entries:
+            index.add(base, quote, item)
+        fuzzy_candidates = _match_pairs(index, pairs, similarity_threshold)
+    else:
+        # 每个进程处理多个分片，分片较小时负载更均衡
+        shard_size = max(1, -(-len(pairs) // (workers * 4)))
+        shards = [pairs[i:i + shard_size] for i in range(0, len(pairs), shard_size)]
+        print(f"   使用 {workers} 个进程处理 {len(shards)} 个分片")
+
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(entries, similarity_threshold)) as executor:
+            results = await asyncio.gather(*(
+                loop.run_in_executor(executor, _match_shard, shard) for shard in shards
+            ))
+        fuzzy_candidates = [candidate for result in results for candidate in result]
 
     print(f"✅ 找到 {len(fuzzy_candidates)} 个有模糊匹配候选的 XT 交易对")
     print()
@@ -225,50 +468,62 @@ async def verify_fuzzy_matches(pool, fuzzy_candidates: List[Dict],
     print(f"   价格偏差阈值: {price_threshold * 100}%")
     print()
 
-    verified_matches = []
+    # 每个唯一的 (exchange, symbol) 只获取一次价格，所有候选共用
+    unique_symbols = {}
+    for candidate in fuzzy_candidates:
+        unique_symbols[('xt', candidate['xt_symbol'])] = None
+        for match in candidate['matches']:
+            unique_symbols[(match['exchange'], match['symbol'])] = None
 
-    async with PriceFetcher() as fetcher:
-        for idx, candidate in enumerate(fuzzy_candidates):
-            if (idx + 1) % 10 == 0:
-                print(f"   进度: {idx + 1}/{len(fuzzy_candidates)}")
+    price_requests = [
+        {'exchange': exchange, 'symbol': symbol, 'key': f"{exchange}:{symbol}"}
+        for exchange, symbol in unique_symbols
+    ]
+    print(f"   {len(fuzzy_candidates)} 个候选共需 {len(price_requests)} 个唯一价格")
 
-            xt_symbol = candidate['xt_symbol']
+    def report_progress(done: int, total: int):
+        if done % 100 == 0 or done == total:
+            print(f"   进度: {done}/{total}")
 
-            # 获取 XT 价格
-            xt_price = await fetcher.get_price('xt', xt_symbol)
-            if not xt_price or xt_price <= 0:
-                continue
+    async with PriceFetcher(bulk=True) as fetcher:
+        prices = await fetcher.get_prices_batch(price_requests, on_progress=report_progress)
+
+    verified_matches = []
 
-            verified_exchanges = []
+    for candidate in fuzzy_candidates:
+        xt_symbol = candidate['xt_symbol']
 
-            # 验证每个候选匹配
-            for match in candidate['matches']:
-                exchange = match['exchange']
-                symbol = match['symbol']
+        # XT 价格
+        xt_price = prices.get(f"xt:{xt_symbol}")
+        if not xt_price or xt_price <= 0:
+            continue
 
-                # 获取该交易所的价格
-                price = await fetcher.get_price(exchange, symbol)
-                if not price or price <= 0:
-                    continue
+        verified_exchanges = []
 
-                # 价格匹配验证（假设 multiplier 都是 1，因为这些是特殊情况）
-                if is_price_match(xt_price, price, 1, 1, price_threshold):
-                    verified_exchanges.append({
-                        **match,
-                        'xt_price': xt_price,
-                        'exchange_price': price,
-                        'price_diff': abs(xt_price - price) / price
-                    })
-
-            if verified_exchanges:
-                verified_matches.append({
-                    'xt_symbol': xt_symbol,
-                    'xt_base': candidate['xt_base'],
-                    'xt_quote': candidate['xt_quote'],
+        # 验证每个候选匹配
+        for match in candidate['matches']:
+            price = prices.get(f"{match['exchange']}:{match['symbol']}")
+            if not price or price <= 0:
+                continue
+
+            # 价格匹配验证（假设 multiplier 都是 1，因为这些是特殊情况）
+            if is_price_match(xt_price, price, 1, 1, price_threshold):
+                verified_exchanges.append({
+                    **match,
                     'xt_price': xt_price,
-                    'matches': verified_exchanges
+                    'exchange_price': price,
+                    'price_diff': abs(xt_price - price) / price
                 })
 
+        if verified_exchanges:
+            verified_matches.append({
+                'xt_symbol': xt_symbol,
+                'xt_base': candidate['xt_base'],
+                'xt_quote': candidate['xt_quote'],
+                'xt_price': xt_price,
+                'matches': verified_exchanges
+            })
+
     print(f"\n✅ 价格验证完成: {len(verified_matches)} 个模糊匹配通过验证")
     print()
 
@@ -443,6 +698,7 @@ async def main():
 
     finally:
         await pool.close()
+        await close_http_session()
 
 
 if __name__ == "__main__":
@@ -1,18 +1,53 @@
 """
 生成XT交易对映射
 基于baseasset/quoteasset + 价格验证
+同时生成跨所有交易所的标准化合约（canonical_instruments），任意交易所都可作为查询起点
 """
+import argparse
 import asyncio
 import asyncpg
-from typing import Dict, List
+from typing import Dict, List, Optional, Set, Tuple
 from config import DB_CONFIG
 from utils.pair_mapping import (
     build_mapping_groups,
-    filter_xt_mappings,
-    format_mapping_summary,
-    is_price_match
+    select_mappings,
+    group_hub,
+    snapshot_mapping_groups,
+    diff_snapshots,
+    normalize_pair,
+    price_match_mask,
+    np,
+    CONTRACT_EXTRACTORS
 )
+from utils.mapping_graph import MappingGraph
+from utils.mapping_index import write_mapping_index
 from utils.price_fetcher import PriceFetcher
+from utils.http_client import close_http_session
+
+# 交易服务 mmap 读取的映射索引文件（见 utils/mapping_index.py）
+MAPPING_INDEX_PATH = 'mapping_index.bin'
+
+MAPPED_EXCHANGES = ['binance', 'okx', 'bybit', 'gate', 'kucoin', 'mexc']
+
+PAIR_MAPPING_COLUMNS = [
+    'normalized_pair', 'normalized_base', 'normalized_quote',
+    'xt_symbol', 'xt_base', 'xt_quote', 'xt_multiplier', 'xt_price',
+] + [
+    f'{exchange}_{field}'
+    for exchange in MAPPED_EXCHANGES
+    for field in ('symbol', 'multiplier', 'price')
+] + ['exchange_count']
+
+INSERT_PAIR_MAPPING_SQL = f"""
+    INSERT INTO pair_mappings ({', '.join(PAIR_MAPPING_COLUMNS)})
+    VALUES ({', '.join(f'${i}' for i in range(1, len(PAIR_MAPPING_COLUMNS) + 1))})
+"""
+
+UPSERT_PAIR_MAPPING_SQL = INSERT_PAIR_MAPPING_SQL + f"""
+    ON CONFLICT (xt_symbol) DO UPDATE SET
+        {', '.join(f'{column} = EXCLUDED.{column}' for column in PAIR_MAPPING_COLUMNS if column != 'xt_symbol')},
+        updated_at = CURRENT_TIMESTAMP
+"""
 
 
 async def load_contracts_from_db(pool) -> Dict[str, List[Dict]]:
@@ -68,6 +103,9 @@ async def fetch_prices_for_mappings(xt_mappings: Dict[str, Dict],
     """
     批量并发获取价格并验证映射（高速版本）
 
+    每个映射组以参考交易所（有XT时为XT，见 group_hub）的价格为基准验证其他交易所，
+    所有价格取回后排成矩阵由 price_match_mask 一次验证
+
     Args:
         xt_mappings: 初步映射结果
         price_threshold: 价格偏差阈值（默认5%）
@@ -77,96 +115,74 @@ async def fetch_prices_for_mappings(xt_mappings: Dict[str, Dict],
     """
     print("💰 批量获取价格并验证映射...")
     print(f"   价格偏差阈值: {price_threshold * 100}%")
-    print(f"   并发模式: 高速批处理")
+    print(f"   并发模式: 批量行情快照（每个交易所一次请求）")
     print()
 
-    verified_mappings = {}
+    exchanges = list(CONTRACT_EXTRACTORS)
+    column_of = {exchange: column for column, exchange in enumerate(exchanges)}
 
-    async with PriceFetcher() as fetcher:
-        # 准备所有价格请求
-        price_requests = []
-        mapping_index = {}  # 记录每个请求对应的mapping信息
+    # 待验证的映射组（每行一个），价格请求的key为 (行, 列)
+    groups = []
+    hub_columns = []
+    price_requests = []
 
-        idx = 0
-        for normalized_pair, mapping in xt_mappings.items():
-            xt_info = mapping.get('xt')
-            if not xt_info:
-                continue
+    for normalized_pair, mapping in xt_mappings.items():
+        hub = group_hub(mapping)
+        if hub is None or len(mapping) < 2:
+            continue
 
-            # XT价格请求
+        row = len(groups)
+        groups.append((normalized_pair, mapping))
+        hub_columns.append(column_of[hub])
+
+        for exchange, info in mapping.items():
             price_requests.append({
-                'exchange': 'xt',
-                'symbol': xt_info['symbol'],
-                'key': f"{idx}_xt"
+                'exchange': exchange,
+                'symbol': info['symbol'],
+                'key': (row, column_of[exchange])
             })
 
-            # 其他交易所价格请求
-            for exchange, info in mapping.items():
-                if exchange == 'xt':
-                    continue
-                price_requests.append({
-                    'exchange': exchange,
-                    'symbol': info['symbol'],
-                    'key': f"{idx}_{exchange}"
-                })
-
-            mapping_index[idx] = {
-                'normalized_pair': normalized_pair,
-                'mapping': mapping
-            }
-            idx += 1
-
+    async with PriceFetcher(bulk=True) as fetcher:
         print(f"   准备获取 {len(price_requests)} 个价格...")
 
-        # 批量并发获取所有价格
-        batch_size = 100
-        all_prices = {}
-
-        for i in range(0, len(price_requests), batch_size):
-            batch = price_requests[i:i+batch_size]
-            print(f"   批处理进度: {i}/{len(price_requests)}")
-
-            prices = await fetcher.get_prices_batch(batch)
-            all_prices.update(prices)
-
-        print(f"\n✅ 价格获取完成，开始验证...")
+        # 滑动窗口并发获取所有价格，按完成情况汇报进度
+        def report_progress(done: int, total: int):
+            if done % 500 == 0 or done == total:
+                print(f"   进度: {done}/{total}")
+
+        all_prices = await fetcher.get_prices_batch(price_requests, on_progress=report_progress)
+
+    print(f"\n✅ 价格获取完成，开始验证...")
+
+    # 价格、倍数按 (映射组, 交易所) 排成对齐的矩阵，整体计算偏差
+    prices = [[0.0] * len(exchanges) for _ in groups]
+    multipliers = [[1] * len(exchanges) for _ in groups]
+    for (row, column), price in all_prices.items():
+        if price:
+            prices[row][column] = price
+    for row, (_, mapping) in enumerate(groups):
+        for exchange, info in mapping.items():
+            multipliers[row][column_of[exchange]] = info['multiplier']
+
+    mask = price_match_mask(prices, multipliers, hub_columns, price_threshold)
+    if np is not None:
+        # 只有参考交易所和至少一个其他交易所通过验证的行才需要展开
+        candidate_rows = np.flatnonzero(mask.sum(axis=1) > 1).tolist()
+        mask = mask.tolist()
+    else:
+        candidate_rows = [row for row, matched in enumerate(mask) if sum(matched) > 1]
 
-        # 验证映射
-        for idx, info in mapping_index.items():
-            normalized_pair = info['normalized_pair']
-            mapping = info['mapping']
-
-            xt_info = mapping.get('xt')
-            xt_key = f"{idx}_xt"
-            xt_price = all_prices.get(xt_key)
-
-            if not xt_price or xt_price <= 0:
-                continue
-
-            xt_info['price'] = xt_price
-            xt_multiplier = xt_info['multiplier']
-
-            verified_exchanges = {'xt': xt_info}
-
-            # 验证其他交易所
-            for exchange, exchange_info in mapping.items():
-                if exchange == 'xt':
-                    continue
-
-                price_key = f"{idx}_{exchange}"
-                price = all_prices.get(price_key)
-
-                if price and price > 0:
-                    exchange_info['price'] = price
-                    multiplier = exchange_info['multiplier']
-
-                    # 验证价格
-                    if is_price_match(xt_price, price, xt_multiplier, multiplier, price_threshold):
-                        verified_exchanges[exchange] = exchange_info
-
-            # 保存通过验证的映射
-            if len(verified_exchanges) > 1:
-                verified_mappings[normalized_pair] = verified_exchanges
+    verified_mappings = {}
+    for row in candidate_rows:
+        normalized_pair, mapping = groups[row]
+        matched = mask[row]
+        verified_exchanges = {}
+        for exchange, info in mapping.items():
+            column = column_of[exchange]
+            if matched[column]:
+                info['price'] = prices[row][column]
+                verified_exchanges[exchange] = info
+        verified_mappings[normalized_pair] = verified_exchanges
 
     total_pairs = len(xt_mappings)
     print(f"✅ 价格验证完成: {len(verified_mappings)}/{total_pairs} 个交易对通过验证")
@@ -175,6 +191,37 @@ async def fetch_prices_for_mappings(xt_mappings: Dict[str, Dict],
     return verified_mappings
 
 
+def build_mapping_record(normalized_pair: str, exchanges: Dict[str, Dict]) -> Optional[tuple]:
+    """
+    把验证后的映射组转换为 pair_mappings 的一行（列顺序同 PAIR_MAPPING_COLUMNS），不含XT时返回None
+    """
+    xt_info = exchanges.get('xt')
+    if not xt_info:
+        return None
+
+    record = [
+        normalized_pair,
+        xt_info['normalized_base'],
+        xt_info['normalized_quote'],
+        xt_info['symbol'],
+        xt_info['base'],
+        xt_info['quote'],
+        xt_info['multiplier'],
+        float(xt_info.get('price', 0)),
+    ]
+
+    # 添加各交易所的symbol、multiplier、price
+    for exchange in MAPPED_EXCHANGES:
+        if exchange in exchanges:
+            info = exchanges[exchange]
+            record.extend([info['symbol'], info['multiplier'], float(info.get('price', 0))])
+        else:
+            record.extend([None, None, None])
+
+    record.append(len(exchanges))
+    return tuple(record)
+
+
 async def save_mappings_to_db(pool, verified_mappings: Dict[str, Dict]):
     """
     保存映射到数据库（列式存储）
@@ -188,69 +235,13 @@ async def save_mappings_to_db(pool, verified_mappings: Dict[str, Dict]):
         success_count = 0
 
         for normalized_pair, exchanges in verified_mappings.items():
-            xt_info = exchanges.get('xt')
-            if not xt_info:
+            record = build_mapping_record(normalized_pair, exchanges)
+            if record is None:
                 continue
 
-            # 提取标准化的base和quote
-            normalized_base = xt_info['normalized_base']
-            normalized_quote = xt_info['normalized_quote']
-
-            # 准备插入数据
-            data = {
-                'normalized_pair': normalized_pair,
-                'normalized_base': normalized_base,
-                'normalized_quote': normalized_quote,
-                'xt_symbol': xt_info['symbol'],
-                'xt_base': xt_info['base'],
-                'xt_quote': xt_info['quote'],
-                'xt_multiplier': xt_info['multiplier'],
-                'xt_price': float(xt_info.get('price', 0)),
-                'exchange_count': len(exchanges),
-            }
-
-            # 添加各交易所的symbol、multiplier、price
-            for exchange in ['binance', 'okx', 'bybit', 'gate', 'kucoin', 'mexc']:
-                if exchange in exchanges:
-                    info = exchanges[exchange]
-                    data[f'{exchange}_symbol'] = info['symbol']
-                    data[f'{exchange}_multiplier'] = info['multiplier']
-                    data[f'{exchange}_price'] = float(info.get('price', 0))
-                else:
-                    data[f'{exchange}_symbol'] = None
-                    data[f'{exchange}_multiplier'] = None
-                    data[f'{exchange}_price'] = None
-
             # 插入数据
             try:
-                await conn.execute("""
-                    INSERT INTO pair_mappings (
-                        normalized_pair, normalized_base, normalized_quote,
-                        xt_symbol, xt_base, xt_quote, xt_multiplier, xt_price,
-                        binance_symbol, binance_multiplier, binance_price,
-                        okx_symbol, okx_multiplier, okx_price,
-                        bybit_symbol, bybit_multiplier, bybit_price,
-                        gate_symbol, gate_multiplier, gate_price,
-                        kucoin_symbol, kucoin_multiplier, kucoin_price,
-                        mexc_symbol, mexc_multiplier, mexc_price,
-                        exchange_count
-                    ) VALUES (
-                        $1, $2, $3, $4, $5, $6, $7, $8,
-                        $9, $10, $11, $12, $13, $14, $15, $16, $17,
-                        $18, $19, $20, $21, $22, $23, $24, $25, $26, $27
-                    )
-                """,
-                    data['normalized_pair'], data['normalized_base'], data['normalized_quote'],
-                    data['xt_symbol'], data['xt_base'], data['xt_quote'],
-                    data['xt_multiplier'], data['xt_price'],
-                    data['binance_symbol'], data['binance_multiplier'], data['binance_price'],
-                    data['okx_symbol'], data['okx_multiplier'], data['okx_price'],
-                    data['bybit_symbol'], data['bybit_multiplier'], data['bybit_price'],
-                    data['gate_symbol'], data['gate_multiplier'], data['gate_price'],
-                    data['kucoin_symbol'], data['kucoin_multiplier'], data['kucoin_price'],
-                    data['mexc_symbol'], data['mexc_multiplier'], data['mexc_price'],
-                    data['exchange_count']
-                )
+                await conn.execute(INSERT_PAIR_MAPPING_SQL, *record)
                 success_count += 1
 
             except Exception as e:
@@ -260,6 +251,179 @@ async def save_mappings_to_db(pool, verified_mappings: Dict[str, Dict]):
     print()
 
 
+async def load_snapshot(pool) -> Dict[Tuple[str, str], str]:
+    """
+    加载上次生成映射时的合约快照
+    """
+    async with pool.acquire() as conn:
+        rows = await conn.fetch("SELECT exchange, symbol, normalized_pair FROM mapping_contract_snapshot")
+    return {(row['exchange'], row['symbol']): row['normalized_pair'] for row in rows}
+
+
+async def save_snapshot(conn, previous: Dict[Tuple[str, str], str],
+                        current: Dict[Tuple[str, str], str]):
+    """
+    更新合约快照：只删除已下线的合约、写入新增或交易对有变化的合约
+    """
+    removed = [node for node in previous if node not in current]
+    changed = [(exchange, symbol, pair) for (exchange, symbol), pair in current.items()
+               if previous.get((exchange, symbol)) != pair]
+
+    if removed:
+        await conn.execute("""
+            DELETE FROM mapping_contract_snapshot s
+            USING unnest($1::text[], $2::text[]) AS r(exchange, symbol)
+            WHERE s.exchange = r.exchange AND s.symbol = r.symbol
+        """, [node[0] for node in removed], [node[1] for node in removed])
+
+    if changed:
+        await conn.executemany("""
+            INSERT INTO mapping_contract_snapshot (exchange, symbol, normalized_pair)
+            VALUES ($1, $2, $3)
+            ON CONFLICT (exchange, symbol) DO UPDATE SET
+                normalized_pair = EXCLUDED.normalized_pair,
+                updated_at = CURRENT_TIMESTAMP
+        """, changed)
+
+
+async def apply_mapping_changes(pool, affected_pairs: Set[str], verified_mappings: Dict[str, Dict],
+                                previous: Dict[Tuple[str, str], str],
+                                current: Dict[Tuple[str, str], str]):
+    """
+    增量写入映射：只删除/更新受影响交易对的 pair_mappings 行，并更新快照（同一事务）
+    """
+    print("💾 增量更新映射...")
+
+    records = []
+    for normalized_pair, exchanges in verified_mappings.items():
+        record = build_mapping_record(normalized_pair, exchanges)
+        if record is not None:
+            records.append(record)
+
+    kept_xt_symbols = [record[PAIR_MAPPING_COLUMNS.index('xt_symbol')] for record in records]
+
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            deleted = await conn.fetchval("""
+                WITH deleted AS (
+                    DELETE FROM pair_mappings
+                    WHERE normalized_pair = ANY($1::text[])
+                      AND NOT (xt_symbol = ANY($2::text[]))
+                    RETURNING 1
+                )
+                SELECT count(*) FROM deleted
+            """, list(affected_pairs), kept_xt_symbols)
+
+            if records:
+                await conn.executemany(UPSERT_PAIR_MAPPING_SQL, records)
+
+            await save_snapshot(conn, previous, current)
+
+    print(f"✅ 更新 {len(records)} 个映射，删除 {deleted} 个映射")
+    print()
+
+
+async def load_fuzzy_edges(pool) -> List[Dict]:
+    """
+    加载已验证的模糊匹配（fuzzy_match.py 生成），作为映射图的模糊边
+    """
+    async with pool.acquire() as conn:
+        exists = await conn.fetchval("SELECT to_regclass('fuzzy_pair_mappings') IS NOT NULL")
+        if not exists:
+            return []
+
+        rows = await conn.fetch("""
+            SELECT xt_symbol, xt_base, xt_quote, exchange, exchange_symbol, exchange_base, exchange_quote
+            FROM fuzzy_pair_mappings
+            WHERE verified = true
+        """)
+
+    return [dict(row) for row in rows]
+
+
+def build_mapping_graph(verified_mappings: Dict[str, Dict], fuzzy_edges: List[Dict],
+                        stable_groups: Optional[Dict[str, List[Dict]]] = None) -> MappingGraph:
+    """
+    由价格验证后的精确映射组和模糊匹配边建立映射图
+
+    Args:
+        verified_mappings: 本次价格验证通过的映射
+        fuzzy_edges: load_fuzzy_edges 的结果
+        stable_groups: 增量模式下未受影响、沿用上次验证结果的映射组
+    """
+    graph = MappingGraph()
+
+    for normalized_pair, contracts in (stable_groups or {}).items():
+        graph.add_group(normalized_pair, contracts)
+
+    for normalized_pair, exchanges in verified_mappings.items():
+        graph.add_group(normalized_pair, exchanges.values())
+
+    for edge in fuzzy_edges:
+        contracts = []
+        for exchange, prefix in (('xt', 'xt'), (edge['exchange'], 'exchange')):
+            base, quote = edge[f'{prefix}_base'], edge[f'{prefix}_quote']
+            multiplier, norm_base, norm_quote = normalize_pair(base, quote)
+            contracts.append({
+                'exchange': exchange,
+                'symbol': edge[f'{prefix}_symbol'],
+                'base': base,
+                'quote': quote,
+                'multiplier': multiplier,
+                'normalized_base': norm_base,
+                'normalized_quote': norm_quote
+            })
+        xt_contract, exchange_contract = contracts
+        normalized_pair = f"{xt_contract['normalized_base']}_{xt_contract['normalized_quote']}"
+        graph.add_edge(xt_contract, exchange_contract, normalized_pair)
+
+    graph.build()
+    return graph
+
+
+async def save_canonical_instruments(pool, graph: MappingGraph):
+    """
+    保存标准化合约（每个合约一行，同一标准化合约的成员共享 instrument_id）
+    """
+    print("💾 保存标准化合约...")
+
+    records = []
+    for instrument in graph.instruments():
+        for member in instrument['members']:
+            records.append((
+                instrument['instrument_id'],
+                instrument['canonical_pair'],
+                member['exchange'],
+                member['symbol'],
+                member.get('base'),
+                member.get('quote'),
+                member.get('multiplier', 1),
+                member['match_type'],
+            ))
+
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            await conn.execute("TRUNCATE TABLE canonical_instruments")
+            await conn.copy_records_to_table(
+                'canonical_instruments',
+                records=records,
+                columns=['instrument_id', 'canonical_pair', 'exchange', 'symbol',
+                         'base', 'quote', 'multiplier', 'match_type']
+            )
+
+    print(f"✅ 成功保存 {len(graph.instruments())} 个标准化合约（{len(records)} 个交易所合约）")
+    print()
+
+
+def export_mapping_index(graph: MappingGraph, path: str = MAPPING_INDEX_PATH):
+    """
+    导出只读映射索引文件，交易服务用 MappingIndex 打开后无需访问数据库即可查询
+    """
+    write_mapping_index(path, graph.instruments())
+    print(f"✅ 映射索引已导出: {path}（{len(graph)} 个合约）")
+    print()
+
+
 async def print_mapping_statistics(pool):
     """
     打印映射统计信息
@@ -339,11 +503,100 @@ async def print_mapping_statistics(pool):
     print("=" * 100)
 
 
-async def main():
-    """主函数"""
+async def load_stable_groups(pool, affected_pairs: Set[str]) -> Dict[str, List[Dict]]:
+    """
+    加载未受影响交易对的已验证合约（canonical_instruments 中的精确映射），
+    按快照中的标准化交易对分组，增量模式下与重新验证的交易对一起重建映射图
+    """
+    async with pool.acquire() as conn:
+        rows = await conn.fetch("""
+            SELECT c.exchange, c.symbol, c.base, c.quote, c.multiplier, s.normalized_pair
+            FROM canonical_instruments c
+            JOIN mapping_contract_snapshot s USING (exchange, symbol)
+            WHERE c.match_type = 'exact'
+              AND NOT (s.normalized_pair = ANY($1::text[]))
+        """, list(affected_pairs))
+
+    groups: Dict[str, List[Dict]] = {}
+    for row in rows:
+        contract = dict(row)
+        groups.setdefault(contract.pop('normalized_pair'), []).append(contract)
+    return groups
+
+
+async def run_full(pool, mapping_groups: Dict[str, List[Dict]]):
+    """全量模式：验证所有映射组并重写映射表"""
+    mappings = select_mappings(mapping_groups)
+    xt_count = sum(1 for mapping in mappings.values() if 'xt' in mapping)
+    print(f"✅ 找到 {len(mappings)} 个交易对的初步映射（其中 {xt_count} 个包含XT）")
+    print()
+
+    # 步骤3: 价格验证（所有交易所之间，不限于XT）
+    verified_mappings = await fetch_prices_for_mappings(mappings, price_threshold=0.05)
+
+    # 步骤4: 保存到数据库（pair_mappings 以XT为准，canonical_instruments 覆盖所有交易所）
+    await save_mappings_to_db(pool, verified_mappings)
+
+    previous = await load_snapshot(pool)
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            await save_snapshot(conn, previous, snapshot_mapping_groups(mapping_groups))
+
+    fuzzy_edges = await load_fuzzy_edges(pool)
+    graph = build_mapping_graph(verified_mappings, fuzzy_edges)
+    await save_canonical_instruments(pool, graph)
+    export_mapping_index(graph)
+
+
+async def run_incremental(pool, mapping_groups: Dict[str, List[Dict]]) -> bool:
+    """
+    增量模式：对比上次快照，只重新验证受影响的交易对并定向更新映射表
+
+    Returns:
+        没有快照（首次运行）时返回False，由调用方改为全量模式
+    """
+    previous = await load_snapshot(pool)
+    if not previous:
+        print("⚠️ 没有上次的合约快照，改为全量生成")
+        print()
+        return False
+
+    current = snapshot_mapping_groups(mapping_groups)
+    affected_pairs = diff_snapshots(previous, current)
+    print(f"✅ 与上次相比: {len(affected_pairs)} 个交易对受影响")
+    print()
+
+    if not affected_pairs:
+        return True
+
+    # 步骤3: 只验证受影响的交易对
+    affected_groups = {pair: mapping_groups[pair] for pair in affected_pairs if pair in mapping_groups}
+    verified_mappings = await fetch_prices_for_mappings(
+        select_mappings(affected_groups), price_threshold=0.05
+    )
+
+    # 步骤4: 定向更新 pair_mappings 和快照，标准化合约由未受影响的部分 + 新验证结果重建
+    stable_groups = await load_stable_groups(pool, affected_pairs)
+    await apply_mapping_changes(pool, affected_pairs, verified_mappings, previous, current)
+
+    fuzzy_edges = await load_fuzzy_edges(pool)
+    graph = build_mapping_graph(verified_mappings, fuzzy_edges, stable_groups)
+    await save_canonical_instruments(pool, graph)
+    export_mapping_index(graph)
+    return True
+
+
+async def main(incremental: bool = False):
+    """
+    主函数
+
+    Args:
+        incremental: 增量模式，只处理上次运行后新上线/下线的合约
+    """
     print("=" * 100)
     print("XT交易对映射生成器")
     print("基于 baseasset/quoteasset + 价格验证（5%阈值）")
+    print(f"模式: {'增量' if incremental else '全量'}")
     print("=" * 100)
     print()
 
@@ -358,6 +611,9 @@ async def main():
             with open('database/mapping_schema.sql', 'r', encoding='utf-8') as f:
                 schema_sql = f.read()
             await conn.execute(schema_sql)
+            with open('database/canonical_instrument_schema.sql', 'r', encoding='utf-8') as f:
+                schema_sql = f.read()
+            await conn.execute(schema_sql)
         print("✅ 映射表已创建")
         print()
 
@@ -367,15 +623,9 @@ async def main():
         # 步骤2: 建立初步映射
         print("🔗 建立初步映射（基于baseasset/quoteasset）...")
         mapping_groups = build_mapping_groups(contracts)
-        xt_mappings = filter_xt_mappings(mapping_groups)
-        print(f"✅ 找到 {len(xt_mappings)} 个XT交易对的初步映射")
-        print()
-
-        # 步骤3: 价格验证
-        verified_mappings = await fetch_prices_for_mappings(xt_mappings, price_threshold=0.05)
 
-        # 步骤4: 保存到数据库
-        await save_mappings_to_db(pool, verified_mappings)
+        if not (incremental and await run_incremental(pool, mapping_groups)):
+            await run_full(pool, mapping_groups)
 
         # 步骤5: 打印统计
         await print_mapping_statistics(pool)
@@ -384,7 +634,13 @@ async def main():
 
     finally:
         await pool.close()
+        await close_http_session()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="XT交易对映射生成器")
+    parser.add_argument('--incremental', action='store_true',
+                        help="增量模式：只重新验证上次运行后新上线/下线合约所在的交易对")
+    args = parser.parse_args()
+
+    asyncio.run(main(incremental=args.incremental))
@@ -4,8 +4,27 @@
 """
 import asyncio
 from config import DB_CONFIG, EXCHANGES, API_TIMEOUT
-from exchanges import BinanceAPI, XTAPI, OKXAPI, BybitAPI, GateAPI, KuCoinAPI, MEXCAPI
+from exchanges import fetch_all_perpetuals
 from database.db_jsonb import DatabaseManager
+from utils.http_client import close_http_session
+
+# 各交易所原始表的主键字段（未列出的默认为 symbol）
+PRIMARY_KEYS = {
+    'okx': 'instId',
+    'gate': 'name',
+}
+
+# 同时写入的交易所数量上限（每个交易所占用连接池中的一个连接）
+WRITE_CONCURRENCY = 4
+
+
+async def load_exchange(db: DatabaseManager, semaphore: asyncio.Semaphore,
+                        exchange_name: str, table_name: str, contracts: list) -> int:
+    """写入单个交易所的数据"""
+    async with semaphore:
+        return await db.bulk_insert_contracts(
+            table_name, contracts, PRIMARY_KEYS.get(exchange_name, 'symbol')
+        )
 
 
 async def main():
@@ -19,35 +38,9 @@ async def main():
     print("📡 步骤1: 获取各交易所数据...")
     print()
 
-    exchanges_data = {}
-
-    # Binance
-    binance = BinanceAPI(EXCHANGES['binance']['api_base'], API_TIMEOUT)
-    exchanges_data['binance'] = binance.get_perpetuals()
-
-    # XT
-    xt = XTAPI(EXCHANGES['xt']['api_base'], API_TIMEOUT)
-    exchanges_data['xt'] = xt.get_perpetuals()
-
-    # OKX
-    okx = OKXAPI(EXCHANGES['okx']['api_base'], API_TIMEOUT)
-    exchanges_data['okx'] = okx.get_perpetuals()
-
-    # Bybit
-    bybit = BybitAPI(EXCHANGES['bybit']['api_base'], API_TIMEOUT)
-    exchanges_data['bybit'] = bybit.get_perpetuals()
-
-    # Gate
-    gate = GateAPI(EXCHANGES['gate']['api_base'], API_TIMEOUT)
-    exchanges_data['gate'] = gate.get_perpetuals()
-
-    # KuCoin
-    kucoin = KuCoinAPI(EXCHANGES['kucoin']['api_base'], API_TIMEOUT)
-    exchanges_data['kucoin'] = kucoin.get_perpetuals()
-
-    # MEXC
-    mexc = MEXCAPI(EXCHANGES['mexc']['api_base'], API_TIMEOUT)
-    exchanges_data['mexc'] = mexc.get_perpetuals()
+    # 所有交易所并发获取，各自独立超时
+    exchanges_data = await fetch_all_perpetuals(EXCHANGES, API_TIMEOUT)
+    await close_http_session()
 
     total_contracts = sum(len(contracts) for contracts in exchanges_data.values())
     print()
@@ -67,63 +60,17 @@ async def main():
         print("📥 步骤3: 插入数据到数据库...")
         print()
 
-        total_inserted = 0
-
-        # Binance
-        count = await db.insert_contracts(
-            EXCHANGES['binance']['table_name'],
-            exchanges_data['binance'],
-            'symbol'
-        )
-        total_inserted += count
-
-        # XT
-        count = await db.insert_contracts(
-            EXCHANGES['xt']['table_name'],
-            exchanges_data['xt'],
-            'symbol'
-        )
-        total_inserted += count
-
-        # OKX
-        count = await db.insert_contracts(
-            EXCHANGES['okx']['table_name'],
-            exchanges_data['okx'],
-            'instId'
-        )
-        total_inserted += count
-
-        # Bybit
-        count = await db.insert_contracts(
-            EXCHANGES['bybit']['table_name'],
-            exchanges_data['bybit'],
-            'symbol'
-        )
-        total_inserted += count
-
-        # Gate
-        count = await db.insert_contracts(
-            EXCHANGES['gate']['table_name'],
-            exchanges_data['gate'],
-            'name'
-        )
-        total_inserted += count
-
-        # KuCoin
-        count = await db.insert_contracts(
-            EXCHANGES['kucoin']['table_name'],
-            exchanges_data['kucoin'],
-            'symbol'
-        )
-        total_inserted += count
-
-        # MEXC
-        count = await db.insert_contracts(
-            EXCHANGES['mexc']['table_name'],
-            exchanges_data['mexc'],
-            'symbol'
-        )
-        total_inserted += count
+        # 各交易所并行写入，总耗时接近最大的单表
+        semaphore = asyncio.Semaphore(WRITE_CONCURRENCY)
+
+        counts = await asyncio.gather(*[
+            load_exchange(
+                db, semaphore, exchange_name, exchange_info['table_name'],
+                exchanges_data.get(exchange_name, [])
+            )
+            for exchange_name, exchange_info in EXCHANGES.items()
+        ])
+        total_inserted = sum(counts)
 
         print()
         print("=" * 80)
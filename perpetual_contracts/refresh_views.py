@@ -0,0 +1,23 @@
+"""
+刷新统一交易信息物化视图
+update_all_data.sh 在映射生成（generate_mappings.py / fuzzy_match.py）之后执行，
+使物化视图反映本轮的原始表和映射表
+"""
+import asyncio
+from config import DB_CONFIG
+from database import DatabaseManager
+
+
+async def main():
+    """主函数"""
+    db = DatabaseManager(DB_CONFIG)
+
+    try:
+        await db.connect()
+        await db.refresh_materialized_views()
+    finally:
+        await db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
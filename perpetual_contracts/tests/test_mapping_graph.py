@@ -0,0 +1,51 @@
+"""
+测试跨交易所合约映射图
+"""
+from utils.mapping_graph import MappingGraph
+
+
+def _contract(exchange, symbol, multiplier=1):
+    return {'exchange': exchange, 'symbol': symbol, 'multiplier': multiplier}
+
+
+def test_lookup_without_xt():
+    """没有XT的映射组也能互查，模糊边把两个分量连通"""
+    graph = MappingGraph()
+    graph.add_group('PEPE_USDT', [
+        _contract('bybit', '1000PEPEUSDT', 1000),
+        _contract('okx', 'PEPE-USDT-SWAP'),
+        _contract('gate', 'PEPE_USDT'),
+    ])
+    graph.add_group('PEPE_USDT_XT', [_contract('xt', 'pepe_usdt')])
+    graph.add_edge(_contract('xt', 'pepe_usdt'), _contract('mexc', 'PEPE1_USDT'), 'PEPE_USDT')
+    graph.add_edge(_contract('xt', 'pepe_usdt'), _contract('okx', 'PEPE-USDT-SWAP'), 'PEPE_USDT')
+    graph.build()
+
+    assert len(graph.instruments()) == 1
+    instrument = graph.instrument('mexc', 'PEPE1_USDT')
+    assert instrument['canonical_pair'] == 'PEPE_USDT'
+    assert graph.lookup('bybit', '1000PEPEUSDT', 'okx')['symbol'] == 'PEPE-USDT-SWAP'
+    assert graph.lookup('okx', 'PEPE-USDT-SWAP', 'mexc')['symbol'] == 'PEPE1_USDT'
+    assert graph.lookup('gate', 'PEPE_USDT', 'binance') is None
+
+    match_types = {m['symbol']: m['match_type'] for m in instrument['members']}
+    assert match_types['PEPE-USDT-SWAP'] == 'exact'
+    assert match_types['PEPE1_USDT'] == 'fuzzy'
+    print(f"✅ {instrument['canonical_pair']}: {sorted(instrument['exchanges'])}")
+
+
+def test_representative_prefers_multiplier():
+    """同一交易所有多个合约时，倍数较大的作为代表合约"""
+    graph = MappingGraph()
+    graph.add_group('SHIB_USDT', [_contract('gate', 'SHIB_USDT'), _contract('okx', 'SHIB-USDT-SWAP')])
+    graph.add_edge(_contract('gate', 'SHIB_USDT'), _contract('gate', '1000SHIB_USDT', 1000), 'SHIB_USDT')
+    graph.build()
+
+    assert graph.lookup('okx', 'SHIB-USDT-SWAP', 'gate')['symbol'] == '1000SHIB_USDT'
+    assert graph.instrument('bybit', 'SHIBUSDT') is None
+
+
+if __name__ == "__main__":
+    test_lookup_without_xt()
+    test_representative_prefers_multiplier()
+    print("✅ 全部通过")
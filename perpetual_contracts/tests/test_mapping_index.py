@@ -0,0 +1,69 @@
+"""
+测试映射索引文件的导出与查询
+"""
+import os
+import tempfile
+
+from utils.mapping_graph import MappingGraph
+from utils.mapping_index import MappingIndex, write_mapping_index
+
+
+def _contract(exchange, symbol, multiplier=1):
+    return {'exchange': exchange, 'symbol': symbol, 'multiplier': multiplier}
+
+
+def test_mapping_index_matches_graph():
+    """索引文件的查询结果与 MappingGraph 一致"""
+    graph = MappingGraph()
+    graph.add_group('SHIB_USDT', [
+        _contract('xt', '1000shib_usdt', 1000),
+        _contract('binance', '1000SHIBUSDT', 1000),
+        _contract('okx', 'SHIB-USDT-SWAP'),
+    ])
+    graph.add_edge(_contract('xt', '1000shib_usdt', 1000), _contract('xt', 'shib_usdt'), 'SHIB_USDT')
+    graph.add_group('BTC_USDT', [_contract('bybit', 'BTCUSDT'), _contract('gate', 'BTC_USDT')])
+    graph.build()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'mapping_index.bin')
+        write_mapping_index(path, graph.instruments())
+
+        with MappingIndex(path) as index:
+            assert len(index) == 6
+            assert index.lookup('xt', 'shib_usdt', 'binance') == {
+                'exchange': 'binance', 'symbol': '1000SHIBUSDT', 'multiplier': 1000
+            }
+            assert index.lookup('okx', 'SHIB-USDT-SWAP', 'xt')['symbol'] == '1000shib_usdt'
+            assert index.lookup('gate', 'BTC_USDT', 'binance') is None
+            assert index.lookup('mexc', 'BTC_USDT', 'gate') is None
+            assert index.symbols('xt') == ['1000shib_usdt', 'shib_usdt']
+
+            instrument = index.instrument('bybit', 'BTCUSDT')
+            assert instrument['canonical_pair'] == 'BTC_USDT'
+            assert [m['symbol'] for m in instrument['members']] == ['BTCUSDT', 'BTC_USDT']
+
+            for node in [('xt', 'shib_usdt'), ('okx', 'SHIB-USDT-SWAP'), ('gate', 'BTC_USDT')]:
+                expected = {exchange: contract['symbol']
+                            for exchange, contract in graph.siblings(*node).items()}
+                actual = {exchange: contract['symbol']
+                          for exchange, contract in index.siblings(*node).items()}
+                assert actual == expected, node
+            print(f"✅ {len(index)} 个合约")
+
+
+def test_empty_mapping_index():
+    """没有标准化合约时也能导出和查询"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'mapping_index.bin')
+        write_mapping_index(path, [])
+
+        with MappingIndex(path) as index:
+            assert len(index) == 0
+            assert index.instrument('xt', 'btc_usdt') is None
+            assert index.symbols('xt') == []
+
+
+if __name__ == "__main__":
+    test_mapping_index_matches_graph()
+    test_empty_mapping_index()
+    print("✅ 全部通过")
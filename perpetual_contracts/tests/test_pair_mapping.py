@@ -0,0 +1,109 @@
+"""
+测试交易对标准化与映射分组
+"""
+from utils.pair_mapping import (
+    extract_multiplier_and_base,
+    build_mapping_groups,
+    snapshot_mapping_groups,
+    diff_snapshots,
+    is_price_match,
+    price_match_mask
+)
+
+
+def test_extract_multiplier_and_base():
+    """倍数前缀/后缀的优先级"""
+    cases = {
+        '1000pepe': (1000, 'pepe'),
+        '1000000mog': (1000000, 'mog'),
+        '1mbabydoge': (1000000, 'babydoge'),
+        '1000SHIB': (1000, 'shib'),
+        'shib1000': (1000, 'shib'),
+        'mog1000000': (1000000, 'mog'),
+        'btc': (1, 'btc'),
+        '1000': (1, '1000'),
+        '1000000': (1000, '000'),
+        ' 1m ': (1, '1m'),
+    }
+    for symbol, expected in cases.items():
+        result = extract_multiplier_and_base(symbol)
+        print(f"{symbol!r:14} -> {result}")
+        assert result == expected, (symbol, result)
+
+
+def test_build_mapping_groups():
+    """各交易所按注册顺序进入同一映射组，无法识别的合约被跳过"""
+    contracts = {
+        'mexc': [{'symbol': 'PEPE_USDT', 'basecoin': 'PEPE', 'quotecoin': 'USDT'}],
+        'okx': [{'instid': 'PEPE-USDT-SWAP'}, {'instid': 'BROKEN'}],
+        'gate': [{'name': 'PEPE_USDT'}],
+        'binance': [{'symbol': '1000PEPEUSDT', 'baseasset': '1000PEPE', 'quoteasset': 'USDT'}],
+        'xt': [{'symbol': 'pepe_usdt', 'basecoin': 'pepe', 'quotecoin': 'usdt'},
+               {'symbol': 'bad', 'basecoin': '', 'quotecoin': 'usdt'}],
+    }
+
+    groups = build_mapping_groups(contracts)
+
+    assert list(groups) == ['PEPE_USDT']
+    group = groups['PEPE_USDT']
+    assert [c['exchange'] for c in group] == ['xt', 'binance', 'okx', 'gate', 'mexc']
+    assert group[1]['multiplier'] == 1000
+    assert group[2]['symbol'] == 'PEPE-USDT-SWAP'
+    assert group[2]['base'] == 'PEPE' and group[2]['quote'] == 'USDT'
+    print(f"✅ PEPE_USDT: {[c['symbol'] for c in group]}")
+
+
+def test_diff_snapshots():
+    """新上线、下线、交易对变化的合约都会让对应交易对受影响"""
+    previous = snapshot_mapping_groups(build_mapping_groups({
+        'xt': [{'symbol': 'pepe_usdt', 'basecoin': 'pepe', 'quotecoin': 'usdt'},
+               {'symbol': 'btc_usdt', 'basecoin': 'btc', 'quotecoin': 'usdt'}],
+        'gate': [{'name': 'OLD_USDT'}, {'name': 'BTC_USDT'}],
+    }))
+    current = snapshot_mapping_groups(build_mapping_groups({
+        'xt': [{'symbol': 'pepe_usdt', 'basecoin': 'pepe', 'quotecoin': 'usdt'},
+               {'symbol': 'btc_usdt', 'basecoin': 'btc', 'quotecoin': 'usdt'}],
+        'gate': [{'name': 'BTC_USDT'}, {'name': 'PEPE_USDT'}],
+    }))
+
+    assert previous[('gate', 'OLD_USDT')] == 'OLD_USDT'
+    assert diff_snapshots(previous, current) == {'OLD_USDT', 'PEPE_USDT'}
+    assert diff_snapshots(current, current) == set()
+
+    renamed = {**current, ('xt', 'pepe_usdt'): 'PEPE_USDC'}
+    assert diff_snapshots(current, renamed) == {'PEPE_USDT', 'PEPE_USDC'}
+
+
+def test_price_match_mask():
+    """矩阵验证结果与 is_price_match 逐个判断一致"""
+    prices = [
+        [1.0, 1010.0, 0.0, 1.2],     # 参考列0: 1000倍合约匹配，缺失价格和偏差20%不匹配
+        [0.0, 1000.0, 1.0, 1.0],     # 参考价格缺失，整行不匹配
+        [0.0003, 0.31, 0.0003, 0.00031],
+    ]
+    multipliers = [
+        [1, 1000, 1, 1],
+        [1, 1000, 1, 1],
+        [1, 1000, 1, 1],
+    ]
+    hub_columns = [0, 0, 2]
+
+    mask = [list(map(bool, row)) for row in price_match_mask(prices, multipliers, hub_columns)]
+    expected = [
+        [is_price_match(row[hub], price, row_multipliers[hub], multiplier)
+         for price, multiplier in zip(row, row_multipliers)]
+        for row, row_multipliers, hub in zip(prices, multipliers, hub_columns)
+    ]
+
+    assert mask == expected
+    assert mask[0] == [True, True, False, False]
+    assert not any(mask[1])
+    assert all(mask[2])
+
+
+if __name__ == "__main__":
+    test_extract_multiplier_and_base()
+    test_build_mapping_groups()
+    test_diff_snapshots()
+    test_price_match_mask()
+    print("✅ 全部通过")
@@ -0,0 +1,112 @@
+"""
+测试位并行编辑距离版本的 string_similarity
+与完整DP表的计算结果逐一对比
+"""
+import random
+from fuzzy_match import string_similarity, string_similarity_batch, BaseAssetIndex
+
+
+def reference_edit_distance(s1: str, s2: str) -> int:
+    """完整DP表计算编辑距离（对照实现）"""
+    m, n = len(s1), len(s2)
+    dp = [[0] * (n + 1) for _ in range(m + 1)]
+    for i in range(m + 1):
+        dp[i][0] = i
+    for j in range(n + 1):
+        dp[0][j] = j
+    for i in range(1, m + 1):
+        for j in range(1, n + 1):
+            cost = 0 if s1[i-1] == s2[j-1] else 1
+            dp[i][j] = min(dp[i-1][j] + 1, dp[i][j-1] + 1, dp[i-1][j-1] + cost)
+    return dp[m][n]
+
+
+def test_examples():
+    """常见币种名称"""
+    print(f"1000pepe vs pepe: {string_similarity('1000pepe', 'PEPE')}")
+    print(f"aioz vs aiozn:    {string_similarity('aioz', 'AIOZN')}")
+    print(f"brett vs bret:    {string_similarity('brett', 'BRET')}")
+
+    assert string_similarity('btc', 'BTC') == 1.0
+    assert string_similarity('1000pepe', 'PEPE') == 0.95
+    assert string_similarity('grt', 'gmt') == 1 - 1 / 3
+
+
+def test_matches_reference():
+    """随机字符串：编辑距离得分与完整DP一致，阈值版本在阈值以上得分不变"""
+    random.seed(0)
+    for _ in range(5000):
+        s1 = ''.join(random.choice('abcd') for _ in range(random.randint(1, 10)))
+        s2 = ''.join(random.choice('abcd') for _ in range(random.randint(1, 10)))
+        score = string_similarity(s1, s2)
+
+        if s1 not in s2 and s2 not in s1:
+            expected = 1 - reference_edit_distance(s1, s2) / max(len(s1), len(s2))
+            assert score == max(0.0, expected), (s1, s2)
+
+        for threshold in (0.5, 0.7, 0.9):
+            bounded = string_similarity(s1, s2, threshold)
+            if score >= threshold:
+                assert bounded == score, (s1, s2, threshold)
+            else:
+                assert bounded < threshold, (s1, s2, threshold)
+
+    print("随机对比通过")
+
+
+def test_batch():
+    """批量版本与逐个计算结果相同"""
+    candidates = ['PEPE', '1000PEPE', 'PEOPLE', 'PENDLE', 'BTC']
+    scores = string_similarity_batch('pepe', candidates)
+    assert scores == [string_similarity('pepe', c) for c in candidates]
+    print(f"批量得分: {dict(zip(candidates, scores))}")
+
+
+def _random_base(rng: random.Random) -> str:
+    """随机 base：短名称、含数字、1000/1M 倍数前缀、纯数字等边界情况"""
+    kind = rng.random()
+    letters = ''.join(rng.choice('abcde') for _ in range(rng.randint(1, 8)))
+    if kind < 0.15:
+        return letters[:rng.randint(1, 2)]
+    if kind < 0.3:
+        return rng.choice(['1000', '1000000', '1M']) + letters
+    if kind < 0.4:
+        return letters + rng.choice(['1000', '2', '3l'])
+    if kind < 0.45:
+        return rng.choice(['1000', '42', 'a1b2', '1'])
+    if kind < 0.55:
+        return letters.upper()
+    return letters
+
+
+def test_base_asset_index_is_exact():
+    """BaseAssetIndex.candidates 覆盖全量扫描中所有达到阈值的候选"""
+    rng = random.Random(7)
+    index = BaseAssetIndex()
+    bases = []
+    for item_id in range(600):
+        base = _random_base(rng)
+        quote = rng.choice(['USDT', 'usdt', 'USDC'])
+        bases.append((base, quote.upper()))
+        index.add(base, quote, item_id)
+
+    queries = [_random_base(rng) for _ in range(300)] + ['1000pepe', 'a', '1000', '1m', 'ab']
+    for query in queries:
+        for quote in ('USDT', 'usdc'):
+            for threshold in (0.5, 0.6, 0.7, 0.8, 0.9, 0.95):
+                expected = {
+                    item_id for item_id, (base, base_quote) in enumerate(bases)
+                    if base_quote == quote.upper() and string_similarity(query, base) >= threshold
+                }
+                candidates = set(index.candidates(query, quote, threshold))
+                missing = expected - candidates
+                assert not missing, (query, quote, threshold, [bases[i] for i in missing])
+
+    print("候选索引与全量扫描对比通过")
+
+
+if __name__ == "__main__":
+    test_examples()
+    test_matches_reference()
+    test_batch()
+    test_base_asset_index_is_exact()
@@ -1,6 +1,6 @@
 #!/bin/bash
 # 一键更新所有数据
-# 依次获取交易所数据、生成精确匹配、生成模糊匹配
+# 依次获取交易所数据、生成精确匹配、生成模糊匹配、刷新物化视图
 
 set -e
 
@@ -30,6 +30,12 @@ echo "=========================================="
 python3 fuzzy_match.py
 echo ""
 
+# 步骤4: 刷新物化视图（依赖映射表，必须在映射生成之后）
+echo "🔄 步骤4: 刷新物化视图..."
+echo "=========================================="
+python3 refresh_views.py
+echo ""
+
 echo "=========================================="
 echo "✅ 所有数据更新完成！"
 echo "=========================================="
@@ -38,6 +44,7 @@ echo "已更新的表："
 echo "  - 7个交易所表: binance/xt/okx/bybit/gate/kucoin/mexc_perpetual"
 echo "  - pair_mappings (精确匹配)"
 echo "  - fuzzy_pair_mappings (模糊匹配)"
+echo "  - mv_unified_trading_info / mv_unified_trading_info_wide (物化视图)"
 echo ""
 echo "提示: 如需迁移到统一映射表，请运行："
 echo "  cd database && psql -U oliver -d perpetual_contracts_raw -f migrate_to_unified_mappings.sql"
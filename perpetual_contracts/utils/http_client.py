@@ -0,0 +1,100 @@
+"""
+共享HTTP传输层
+交易所API（exchanges）和价格获取（PriceFetcher）共用同一个aiohttp会话：
+按主机划分的keep-alive连接池、DNS缓存、gzip/brotli压缩协商，
+同一进程内重复刷新时可以复用已建立的TCP+TLS连接
+"""
+import asyncio
+import aiohttp
+from typing import Optional
+
+try:
+    # aiohttp 检测到 brotli 库后会自动解压 br 响应
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = 'gzip, deflate, br'
+    except ImportError:
+        ACCEPT_ENCODING = 'gzip, deflate'
+
+# 连接池配置
+CONNECTION_LIMIT = 100          # 总连接数上限
+CONNECTION_LIMIT_PER_HOST = 20  # 单个主机连接数上限
+DNS_CACHE_TTL = 300             # DNS缓存时间（秒）
+KEEPALIVE_TIMEOUT = 60          # 空闲连接保持时间（秒）
+
+_session: Optional[aiohttp.ClientSession] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+# 通过 acquire_http_session 持有会话的上下文数（如 async with PriceFetcher()）
+_holders = 0
+# 会话是否完全由持有者管理：由 acquire_http_session 创建、且没有被 get_http_session 直接使用过
+_owned = False
+
+
+def _current_session(owned: bool) -> aiohttp.ClientSession:
+    global _session, _session_loop, _holders, _owned
+
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        connector = aiohttp.TCPConnector(
+            limit=CONNECTION_LIMIT,
+            limit_per_host=CONNECTION_LIMIT_PER_HOST,
+            ttl_dns_cache=DNS_CACHE_TTL,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+        )
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            headers={'Accept-Encoding': ACCEPT_ENCODING},
+        )
+        _session_loop = loop
+        _holders = 0
+        _owned = owned
+    elif not owned:
+        _owned = False
+
+    return _session
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """
+    获取当前事件循环的共享会话（不存在或已关闭时创建）
+    必须在事件循环内调用；直接使用会话的程序需在退出前调用 close_http_session
+    """
+    return _current_session(owned=False)
+
+
+def acquire_http_session() -> aiohttp.ClientSession:
+    """
+    以上下文方式持有共享会话（与 release_http_session 成对调用）
+
+    会话由持有者创建时，最后一个持有者释放后自动关闭；
+    程序已经在直接使用的会话不会被关闭，仍由 close_http_session 负责
+    """
+    global _holders
+
+    session = _current_session(owned=True)
+    _holders += 1
+    return session
+
+
+async def release_http_session():
+    """释放 acquire_http_session 持有的会话"""
+    global _holders
+
+    _holders = max(_holders - 1, 0)
+    if _holders == 0 and _owned:
+        await close_http_session()
+
+
+async def close_http_session():
+    """关闭共享会话（程序退出前调用）"""
+    global _session, _session_loop, _holders, _owned
+
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+    _session_loop = None
+    _holders = 0
+    _owned = False
@@ -0,0 +1,150 @@
+"""
+跨交易所合约映射图
+用并查集把等价合约（精确映射组 + 模糊匹配边）连成标准化合约（canonical instrument），
+任意交易所都可以作为查询起点，不依赖XT是否上线该交易对
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+Node = Tuple[str, str]  # (exchange, symbol)
+
+
+class MappingGraph:
+    """
+    合约等价关系图
+
+    用法:
+        graph = MappingGraph()
+        graph.add_group('PEPE_USDT', contracts)          # 精确映射组内互相连通
+        graph.add_edge(xt_contract, okx_contract)        # 模糊匹配边
+        graph.build()
+        graph.lookup('bybit', '1000PEPEUSDT', 'okx')      # -> OKX 合约信息
+    """
+
+    def __init__(self):
+        self._parent: Dict[Node, Node] = {}
+        self._contracts: Dict[Node, Dict] = {}
+        self._pairs: Dict[Node, str] = {}        # 节点所属的标准化交易对（精确映射组的key）
+        self._match_types: Dict[Node, str] = {}  # 节点加入图的方式: exact / fuzzy
+
+        # build() 之后可用
+        self._instrument_of: Dict[Node, int] = {}
+        self._instruments: List[Dict] = []
+
+    def __len__(self) -> int:
+        return len(self._parent)
+
+    def _add_node(self, contract: Dict, normalized_pair: str, match_type: str) -> Node:
+        node = (contract['exchange'], contract['symbol'])
+        if node not in self._parent:
+            self._parent[node] = node
+            self._contracts[node] = contract
+            self._pairs[node] = normalized_pair
+            self._match_types[node] = match_type
+        elif match_type == 'exact' and self._match_types[node] != 'exact':
+            # 同一合约既有模糊边又在精确映射组中时，以精确映射为准
+            self._pairs[node] = normalized_pair
+            self._match_types[node] = 'exact'
+        return node
+
+    def find(self, node: Node) -> Node:
+        """查找根节点（路径减半）"""
+        parent = self._parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def union(self, a: Node, b: Node):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self._parent[root_b] = root_a
+
+    def add_group(self, normalized_pair: str, contracts: Iterable[Dict]):
+        """
+        添加精确映射组，组内所有合约互相连通
+
+        Args:
+            normalized_pair: 标准化交易对（如 PEPE_USDT）
+            contracts: 组内合约，需包含 exchange/symbol/multiplier 等字段
+        """
+        first = None
+        for contract in contracts:
+            node = self._add_node(contract, normalized_pair, 'exact')
+            if first is None:
+                first = node
+            else:
+                self.union(first, node)
+
+    def add_edge(self, contract_a: Dict, contract_b: Dict, normalized_pair: str = ''):
+        """添加模糊匹配边"""
+        node_a = self._add_node(contract_a, normalized_pair, 'fuzzy')
+        node_b = self._add_node(contract_b, normalized_pair, 'fuzzy')
+        self.union(node_a, node_b)
+
+    def build(self):
+        """
+        一次遍历生成标准化合约及节点索引
+
+        每个连通分量是一个标准化合约：canonical_pair 取分量内精确映射最多的标准化交易对，
+        同一交易所有多个合约时，以倍数较大的作为该交易所的代表合约
+        （如1000shib_usdt优先于shib_usdt，因为其他交易所通常用1000SHIB）
+        """
+        components: Dict[Node, List[Node]] = {}
+        for node in self._parent:
+            components.setdefault(self.find(node), []).append(node)
+
+        self._instrument_of = {}
+        self._instruments = []
+
+        for nodes in components.values():
+            pair_counts: Dict[str, int] = {}
+            representatives: Dict[str, Dict] = {}
+
+            for node in nodes:
+                if self._match_types[node] == 'exact':
+                    pair = self._pairs[node]
+                    pair_counts[pair] = pair_counts.get(pair, 0) + 1
+
+                exchange = node[0]
+                contract = self._contracts[node]
+                current = representatives.get(exchange)
+                if current is None or contract.get('multiplier', 1) > current.get('multiplier', 1):
+                    representatives[exchange] = contract
+
+            if pair_counts:
+                canonical_pair = min(pair_counts, key=lambda pair: (-pair_counts[pair], pair))
+            else:
+                canonical_pair = min(self._pairs[node] for node in nodes)
+
+            instrument_id = len(self._instruments)
+            self._instruments.append({
+                'instrument_id': instrument_id,
+                'canonical_pair': canonical_pair,
+                'exchanges': representatives,
+                'members': [
+                    dict(self._contracts[node], match_type=self._match_types[node])
+                    for node in nodes
+                ],
+            })
+            for node in nodes:
+                self._instrument_of[node] = instrument_id
+
+    def instrument(self, exchange: str, symbol: str) -> Optional[Dict]:
+        """合约所属的标准化合约"""
+        instrument_id = self._instrument_of.get((exchange, symbol))
+        if instrument_id is None:
+            return None
+        return self._instruments[instrument_id]
+
+    def siblings(self, exchange: str, symbol: str) -> Dict[str, Dict]:
+        """合约在各交易所的等价合约 {exchange: contract}"""
+        instrument = self.instrument(exchange, symbol)
+        return instrument['exchanges'] if instrument else {}
+
+    def lookup(self, exchange: str, symbol: str, target_exchange: str) -> Optional[Dict]:
+        """查询合约在目标交易所的等价合约"""
+        return self.siblings(exchange, symbol).get(target_exchange)
+
+    def instruments(self) -> List[Dict]:
+        """所有标准化合约"""
+        return self._instruments
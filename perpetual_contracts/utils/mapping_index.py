@@ -0,0 +1,258 @@
+"""
+只读映射索引文件
+generate_mappings.py 结束时把标准化合约导出为二进制文件，交易服务用 mmap 打开后
+直接查询 交易所合约 -> 标准化交易对 -> 各交易所等价合约及倍数，不需要访问数据库，
+多个进程共享同一份页缓存
+
+文件格式（小端，所有数组为 uint32）:
+    header          magic, version, key_count, instrument_count, member_count,
+                    key_blob_size, pair_blob_size, bucket_count
+    key_offsets     [key_count + 1]          key_blob 中每个key的起止位置
+    key_instrument  [key_count]              key 所属的标准化合约
+    key_multiplier  [key_count]              key 对应合约的倍数
+    member_offsets  [instrument_count + 1]   members 中每个标准化合约的起止位置
+    members         [member_count]           成员的 key 下标（按交易所、倍数从大到小排序）
+    pair_offsets    [instrument_count + 1]   pair_blob 中每个标准化交易对的起止位置
+    buckets         [bucket_count]           开放寻址哈希表（crc32 + 线性探测），key 下标 + 1，0 为空
+    key_blob        b'exchange\\x00symbol'，按字节序排序
+    pair_blob       标准化交易对字符串
+"""
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from typing import Dict, List, Optional
+
+MAGIC = b'TBMI'
+VERSION = 1
+_HEADER = struct.Struct('<4sIIIIIII')
+
+
+def _key(exchange: str, symbol: str) -> bytes:
+    return f"{exchange}\x00{symbol}".encode('utf-8')
+
+
+def _uint32_array(values) -> bytes:
+    data = array('I', values)
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return data.tobytes()
+
+
+def write_mapping_index(path: str, instruments: List[Dict]):
+    """
+    导出映射索引文件
+
+    先写临时文件再原子替换，已经 mmap 旧文件的进程不受影响
+
+    Args:
+        path: 输出路径
+        instruments: MappingGraph.instruments() 的结果
+    """
+    entries = []  # (key, instrument_id, multiplier)
+    pairs = []
+    for instrument_id, instrument in enumerate(instruments):
+        pairs.append(instrument['canonical_pair'].encode('utf-8'))
+        for member in instrument['members']:
+            entries.append((_key(member['exchange'], member['symbol']),
+                            instrument_id, member.get('multiplier', 1)))
+
+    entries.sort()
+
+    # 每个标准化合约的成员：按交易所排序，同一交易所倍数大的在前（即该交易所的代表合约）
+    members_by_instrument = [[] for _ in instruments]
+    for index, (key, instrument_id, multiplier) in enumerate(entries):
+        members_by_instrument[instrument_id].append((key.split(b'\x00', 1)[0], -multiplier, index))
+
+    member_offsets = [0]
+    members = []
+    for instrument_members in members_by_instrument:
+        instrument_members.sort()
+        members.extend(index for _, _, index in instrument_members)
+        member_offsets.append(len(members))
+
+    key_offsets = [0]
+    for key, _, _ in entries:
+        key_offsets.append(key_offsets[-1] + len(key))
+
+    pair_offsets = [0]
+    for pair in pairs:
+        pair_offsets.append(pair_offsets[-1] + len(pair))
+
+    # 哈希表至少为key数量的2倍（2的幂），保证探测很短
+    bucket_count = 1
+    while bucket_count < 2 * len(entries):
+        bucket_count *= 2
+    buckets = [0] * bucket_count
+    for index, (key, _, _) in enumerate(entries):
+        slot = zlib.crc32(key) & (bucket_count - 1)
+        while buckets[slot]:
+            slot = (slot + 1) & (bucket_count - 1)
+        buckets[slot] = index + 1
+
+    key_blob = b''.join(key for key, _, _ in entries)
+    pair_blob = b''.join(pairs)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(entries), len(instruments), len(members),
+                             len(key_blob), len(pair_blob), bucket_count))
+        f.write(_uint32_array(key_offsets))
+        f.write(_uint32_array(instrument_id for _, instrument_id, _ in entries))
+        f.write(_uint32_array(multiplier for _, _, multiplier in entries))
+        f.write(_uint32_array(member_offsets))
+        f.write(_uint32_array(members))
+        f.write(_uint32_array(pair_offsets))
+        f.write(_uint32_array(buckets))
+        f.write(key_blob)
+        f.write(pair_blob)
+    os.replace(tmp_path, path)
+
+
+class MappingIndex:
+    """
+    映射索引读取（接口同 MappingGraph 的查询部分）
+
+    用法:
+        with MappingIndex('mapping_index.bin') as index:
+            index.lookup('xt', '1000shib_usdt', 'binance')
+            # -> {'exchange': 'binance', 'symbol': '1000SHIBUSDT', 'multiplier': 1000}
+    """
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, key_count, instrument_count, member_count,
+         key_blob_size, pair_blob_size, bucket_count) = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"不支持的映射索引文件: {path}")
+
+        self._key_count = key_count
+        self._instrument_count = instrument_count
+        self._bucket_mask = bucket_count - 1
+
+        view = memoryview(self._mmap)
+        position = _HEADER.size
+        sections = []
+        for length in (key_count + 1, key_count, key_count,
+                       instrument_count + 1, member_count, instrument_count + 1, bucket_count):
+            size = length * 4
+            section = view[position:position + size]
+            if sys.byteorder == 'big':
+                data = array('I')
+                data.frombytes(section.tobytes())
+                data.byteswap()
+                section = data
+            else:
+                section = section.cast('I')
+            sections.append(section)
+            position += size
+
+        (self._key_offsets, self._key_instrument, self._key_multiplier,
+         self._member_offsets, self._members, self._pair_offsets, self._buckets) = sections
+
+        self._key_blob = view[position:position + key_blob_size]
+        position += key_blob_size
+        self._pair_blob = view[position:position + pair_blob_size]
+
+    def close(self):
+        for section in (self._key_offsets, self._key_instrument, self._key_multiplier,
+                        self._member_offsets, self._members, self._pair_offsets,
+                        self._buckets, self._key_blob, self._pair_blob):
+            if isinstance(section, memoryview):
+                section.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._key_count
+
+    def _key_at(self, index: int) -> bytes:
+        return self._key_blob[self._key_offsets[index]:self._key_offsets[index + 1]].tobytes()
+
+    def _find(self, exchange: str, symbol: str) -> Optional[int]:
+        """通过哈希表查找合约的 key 下标"""
+        key = _key(exchange, symbol)
+        buckets, mask = self._buckets, self._bucket_mask
+        slot = zlib.crc32(key) & mask
+        while True:
+            entry = buckets[slot]
+            if not entry:
+                return None
+            if self._key_at(entry - 1) == key:
+                return entry - 1
+            slot = (slot + 1) & mask
+
+    def symbols(self, exchange: str) -> List[str]:
+        """某个交易所的所有合约（key 按字节序排序，同一交易所的合约是连续的一段）"""
+        prefix = exchange.encode('utf-8') + b'\x00'
+        lo, hi = 0, self._key_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < prefix:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        symbols = []
+        for index in range(lo, self._key_count):
+            key = self._key_at(index)
+            if not key.startswith(prefix):
+                break
+            symbols.append(key[len(prefix):].decode('utf-8'))
+        return symbols
+
+    def _contract(self, index: int) -> Dict:
+        exchange, symbol = self._key_at(index).decode('utf-8').split('\x00', 1)
+        return {'exchange': exchange, 'symbol': symbol, 'multiplier': self._key_multiplier[index]}
+
+    def instrument(self, exchange: str, symbol: str) -> Optional[Dict]:
+        """合约所属的标准化合约"""
+        index = self._find(exchange, symbol)
+        if index is None:
+            return None
+
+        instrument_id = self._key_instrument[index]
+        start, end = self._member_offsets[instrument_id], self._member_offsets[instrument_id + 1]
+        pair = self._pair_blob[self._pair_offsets[instrument_id]:self._pair_offsets[instrument_id + 1]]
+        return {
+            'instrument_id': instrument_id,
+            'canonical_pair': pair.tobytes().decode('utf-8'),
+            'members': [self._contract(self._members[i]) for i in range(start, end)],
+        }
+
+    def siblings(self, exchange: str, symbol: str) -> Dict[str, Dict]:
+        """合约在各交易所的等价合约 {exchange: contract}（每个交易所取倍数最大的）"""
+        instrument = self.instrument(exchange, symbol)
+        if instrument is None:
+            return {}
+
+        siblings = {}
+        for member in instrument['members']:
+            siblings.setdefault(member['exchange'], member)
+        return siblings
+
+    def lookup(self, exchange: str, symbol: str, target_exchange: str) -> Optional[Dict]:
+        """查询合约在目标交易所的等价合约"""
+        index = self._find(exchange, symbol)
+        if index is None:
+            return None
+
+        instrument_id = self._key_instrument[index]
+        target = target_exchange.encode('utf-8') + b'\x00'
+        key_blob, key_offsets, members = self._key_blob, self._key_offsets, self._members
+        for i in range(self._member_offsets[instrument_id], self._member_offsets[instrument_id + 1]):
+            member = members[i]
+            start = key_offsets[member]
+            if key_blob[start:start + len(target)] == target:
+                return self._contract(member)
+        return None
@@ -3,9 +3,39 @@
 基于 baseasset + quoteasset 建立XT与其他交易所的交易对映射
 """
 import re
-from typing import Dict, List, Tuple, Optional
-
-
+from functools import lru_cache
+from typing import Dict, List, Tuple, Optional, Callable, Iterable, Set, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 倍数前缀/后缀，按优先级排列在同一个正则中（与逐个尝试的顺序一致）：
+# 前缀 1000000 / 1m / 1000，后缀 1000000 / 1000
+_MULTIPLIER_PATTERN = re.compile(
+    r'^(?:'
+    r'1000000(?P<p1000000>\w+)'   # 1000000mog
+    r'|1m(?P<p1m>\w+)'            # 1mbabydoge
+    r'|1000(?P<p1000>\w+)'        # 1000pepe, 1000shib
+    r'|(?P<s1000000>\w+)1000000'  # mog1000000
+    r'|(?P<s1000>\w+)1000'        # shib1000, pepe1000
+    r')$'
+)
+
+_MULTIPLIERS = {
+    'p1000000': 1000000,
+    'p1m': 1000000,
+    'p1000': 1000,
+    's1000000': 1000000,
+    's1000': 1000,
+}
+
+# 标准化结果缓存大小（同一币种在各交易所反复出现）
+NORMALIZE_CACHE_SIZE = 65536
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
 def extract_multiplier_and_base(symbol: str) -> Tuple[int, str]:
     """
     提取交易对中的数字前缀/后缀倍数和真实base asset
@@ -30,30 +60,10 @@ def extract_multiplier_and_base(symbol: str) -> Tuple[int, str]:
     """
     symbol = symbol.lower().strip()
 
-    # 匹配模式1：数字在前
-    prefix_patterns = [
-        (r'^1000000(\w+)$', 1000000),  # 1000000mog
-        (r'^1m(\w+)$', 1000000),        # 1mbabydoge
-        (r'^1000(\w+)$', 1000),         # 1000pepe, 1000shib
-    ]
-
-    for pattern, multiplier in prefix_patterns:
-        match = re.match(pattern, symbol)
-        if match:
-            base = match.group(1)
-            return (multiplier, base)
-
-    # 匹配模式2：数字在后
-    suffix_patterns = [
-        (r'^(\w+)1000000$', 1000000),  # mog1000000
-        (r'^(\w+)1000$', 1000),         # shib1000, pepe1000
-    ]
-
-    for pattern, multiplier in suffix_patterns:
-        match = re.match(pattern, symbol)
-        if match:
-            base = match.group(1)
-            return (multiplier, base)
+    match = _MULTIPLIER_PATTERN.match(symbol)
+    if match:
+        group = match.lastgroup
+        return (_MULTIPLIERS[group], match.group(group))
 
     # 没有前缀/后缀，返回原值
     return (1, symbol)
@@ -69,6 +79,7 @@ def normalize_asset(asset: str) -> Tuple[int, str]:
     return extract_multiplier_and_base(asset)
 
 
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
 def normalize_pair(base: str, quote: str) -> Tuple[int, str, str]:
     """
     标准化交易对
@@ -122,10 +133,97 @@ def is_price_match(price1: float, price2: float, multiplier1: int, multiplier2:
     return diff <= threshold
 
 
+def price_match_mask(prices: Sequence[Sequence[float]], multipliers: Sequence[Sequence[int]],
+                     hub_columns: Sequence[int], threshold: float = 0.05):
+    """
+    批量判断价格是否匹配（is_price_match 的矩阵版本）
+
+    每行是一个映射组，每列是一个交易所，每行以 hub_columns 指定列的价格为基准；
+    有 numpy 时整个矩阵一次计算，否则逐个调用 is_price_match
+
+    Args:
+        prices: 价格矩阵，缺失的价格填0
+        multipliers: 倍数矩阵，形状同 prices
+        hub_columns: 每行参考交易所所在的列
+        threshold: 价格偏差阈值（默认5%）
+
+    Returns:
+        布尔矩阵（numpy数组或嵌套list），参考交易所本身的格子在其价格有效时为True
+    """
+    if np is None:
+        return [
+            [is_price_match(row[hub], price, row_multipliers[hub], multiplier, threshold)
+             for price, multiplier in zip(row, row_multipliers)]
+            for row, row_multipliers, hub in zip(prices, multipliers, hub_columns)
+        ]
+
+    if len(hub_columns) == 0:
+        return np.zeros((0, 0), dtype=bool)
+
+    prices = np.asarray(prices, dtype=np.float64)
+    multipliers = np.asarray(multipliers, dtype=np.float64)
+    rows = np.arange(len(prices))
+    hub_columns = np.asarray(hub_columns, dtype=np.intp)
+
+    hub_prices = prices[rows, hub_columns][:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        adjusted = prices / multipliers
+        adjusted_hub = adjusted[rows, hub_columns][:, None]
+        diff = np.abs(adjusted_hub - adjusted) / adjusted
+
+    return (hub_prices > 0) & (prices > 0) & (diff <= threshold)
+
+
+def _asset_fields(base_field: str, quote_field: str) -> Callable[[Dict], Optional[Tuple[str, str, str]]]:
+    """从 base/quote 字段读取"""
+    def extract(contract: Dict) -> Optional[Tuple[str, str, str]]:
+        base = contract.get(base_field, '')
+        quote = contract.get(quote_field, '')
+        if not base or not quote:
+            return None
+        return contract.get('symbol'), base, quote
+    return extract
+
+
+def _split_symbol(symbol_field: str, separator: str) -> Callable[[Dict], Optional[Tuple[str, str, str]]]:
+    """从交易对名称拆分 base/quote"""
+    def extract(contract: Dict) -> Optional[Tuple[str, str, str]]:
+        symbol = contract.get(symbol_field, '')
+        if not symbol:
+            return None
+        parts = symbol.split(separator)
+        if len(parts) < 2:
+            return None
+        return symbol, parts[0], parts[1]
+    return extract
+
+
+# 各交易所的字段提取器: contract -> (symbol, base, quote)，无法识别时返回 None
+# 顺序决定映射组内各交易所的先后
+CONTRACT_EXTRACTORS: Dict[str, Callable[[Dict], Optional[Tuple[str, str, str]]]] = {
+    'xt': _asset_fields('basecoin', 'quotecoin'),
+    'binance': _asset_fields('baseasset', 'quoteasset'),
+    'okx': _split_symbol('instid', '-'),           # OKX格式: BTC-USDT-SWAP
+    'bybit': _asset_fields('basecoin', 'quotecoin'),
+    'gate': _split_symbol('name', '_'),            # Gate格式: BTC_USDT
+    'kucoin': _asset_fields('basecurrency', 'quotecurrency'),
+    'mexc': _asset_fields('basecoin', 'quotecoin'),
+}
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def _mapping_key(base: str, quote: str) -> Tuple[str, int, str, str]:
+    """(key, multiplier, normalized_base, normalized_quote)"""
+    multiplier, norm_base, norm_quote = normalize_pair(base, quote)
+    return f"{norm_base}_{norm_quote}", multiplier, norm_base, norm_quote
+
+
 def build_mapping_groups(contracts_by_exchange: Dict[str, List[Dict]]) -> Dict[str, List[Dict]]:
     """
     根据标准化的交易对建立映射组
 
+    按 CONTRACT_EXTRACTORS 的交易所顺序一次遍历所有合约，标准化结果按 (base, quote) 缓存
+
     Args:
         contracts_by_exchange: {
             'xt': [{'symbol': 'btc_usdt', 'basecoin': 'btc', 'quotecoin': 'usdt'}, ...],
@@ -149,133 +247,22 @@ def build_mapping_groups(contracts_by_exchange: Dict[str, List[Dict]]) -> Dict[s
     """
     mapping_groups = {}
 
-    # XT
-    if 'xt' in contracts_by_exchange:
-        for contract in contracts_by_exchange['xt']:
-            base = contract.get('basecoin', '')
-            quote = contract.get('quotecoin', '')
-            if not base or not quote:
-                continue
-
-            multiplier, norm_base, norm_quote = normalize_pair(base, quote)
-            key = f"{norm_base}_{norm_quote}"
-
-            if key not in mapping_groups:
-                mapping_groups[key] = []
-
-            mapping_groups[key].append({
-                'exchange': 'xt',
-                'symbol': contract.get('symbol'),
-                'base': base,
-                'quote': quote,
-                'multiplier': multiplier,
-                'normalized_base': norm_base,
-                'normalized_quote': norm_quote
-            })
-
-    # Binance
-    if 'binance' in contracts_by_exchange:
-        for contract in contracts_by_exchange['binance']:
-            base = contract.get('baseasset', '')
-            quote = contract.get('quoteasset', '')
-            if not base or not quote:
-                continue
-
-            multiplier, norm_base, norm_quote = normalize_pair(base, quote)
-            key = f"{norm_base}_{norm_quote}"
-
-            if key not in mapping_groups:
-                mapping_groups[key] = []
-
-            mapping_groups[key].append({
-                'exchange': 'binance',
-                'symbol': contract.get('symbol'),
-                'base': base,
-                'quote': quote,
-                'multiplier': multiplier,
-                'normalized_base': norm_base,
-                'normalized_quote': norm_quote
-            })
-
-    # OKX
-    if 'okx' in contracts_by_exchange:
-        for contract in contracts_by_exchange['okx']:
-            instid = contract.get('instid', '')
-            if not instid:
-                continue
-
-            # OKX格式: BTC-USDT-SWAP
-            parts = instid.split('-')
-            if len(parts) < 2:
-                continue
-
-            base = parts[0]
-            quote = parts[1]
-
-            multiplier, norm_base, norm_quote = normalize_pair(base, quote)
-            key = f"{norm_base}_{norm_quote}"
-
-            if key not in mapping_groups:
-                mapping_groups[key] = []
-
-            mapping_groups[key].append({
-                'exchange': 'okx',
-                'symbol': instid,
-                'base': base,
-                'quote': quote,
-                'multiplier': multiplier,
-                'normalized_base': norm_base,
-                'normalized_quote': norm_quote
-            })
-
-    # Bybit
-    if 'bybit' in contracts_by_exchange:
-        for contract in contracts_by_exchange['bybit']:
-            base = contract.get('basecoin', '')
-            quote = contract.get('quotecoin', '')
-            if not base or not quote:
-                continue
-
-            multiplier, norm_base, norm_quote = normalize_pair(base, quote)
-            key = f"{norm_base}_{norm_quote}"
-
-            if key not in mapping_groups:
-                mapping_groups[key] = []
-
-            mapping_groups[key].append({
-                'exchange': 'bybit',
-                'symbol': contract.get('symbol'),
-                'base': base,
-                'quote': quote,
-                'multiplier': multiplier,
-                'normalized_base': norm_base,
-                'normalized_quote': norm_quote
-            })
-
-    # Gate
-    if 'gate' in contracts_by_exchange:
-        for contract in contracts_by_exchange['gate']:
-            name = contract.get('name', '')
-            if not name:
-                continue
-
-            # Gate格式: BTC_USDT
-            parts = name.split('_')
-            if len(parts) < 2:
+    for exchange, extract in CONTRACT_EXTRACTORS.items():
+        for contract in contracts_by_exchange.get(exchange, ()):
+            fields = extract(contract)
+            if fields is None:
                 continue
 
-            base = parts[0]
-            quote = parts[1]
-
-            multiplier, norm_base, norm_quote = normalize_pair(base, quote)
-            key = f"{norm_base}_{norm_quote}"
+            symbol, base, quote = fields
+            key, multiplier, norm_base, norm_quote = _mapping_key(base, quote)
 
-            if key not in mapping_groups:
-                mapping_groups[key] = []
+            group = mapping_groups.get(key)
+            if group is None:
+                group = mapping_groups[key] = []
 
-            mapping_groups[key].append({
-                'exchange': 'gate',
-                'symbol': name,
+            group.append({
+                'exchange': exchange,
+                'symbol': symbol,
                 'base': base,
                 'quote': quote,
                 'multiplier': multiplier,
@@ -283,63 +270,33 @@ def build_mapping_groups(contracts_by_exchange: Dict[str, List[Dict]]) -> Dict[s
                 'normalized_quote': norm_quote
             })
 
-    # KuCoin
-    if 'kucoin' in contracts_by_exchange:
-        for contract in contracts_by_exchange['kucoin']:
-            base = contract.get('basecurrency', '')
-            quote = contract.get('quotecurrency', '')
-            if not base or not quote:
-                continue
-
-            multiplier, norm_base, norm_quote = normalize_pair(base, quote)
-            key = f"{norm_base}_{norm_quote}"
-
-            if key not in mapping_groups:
-                mapping_groups[key] = []
-
-            mapping_groups[key].append({
-                'exchange': 'kucoin',
-                'symbol': contract.get('symbol'),
-                'base': base,
-                'quote': quote,
-                'multiplier': multiplier,
-                'normalized_base': norm_base,
-                'normalized_quote': norm_quote
-            })
-
-    # MEXC
-    if 'mexc' in contracts_by_exchange:
-        for contract in contracts_by_exchange['mexc']:
-            base = contract.get('basecoin', '')
-            quote = contract.get('quotecoin', '')
-            if not base or not quote:
-                continue
-
-            multiplier, norm_base, norm_quote = normalize_pair(base, quote)
-            key = f"{norm_base}_{norm_quote}"
+    return mapping_groups
 
-            if key not in mapping_groups:
-                mapping_groups[key] = []
 
-            mapping_groups[key].append({
-                'exchange': 'mexc',
-                'symbol': contract.get('symbol'),
-                'base': base,
-                'quote': quote,
-                'multiplier': multiplier,
-                'normalized_base': norm_base,
-                'normalized_quote': norm_quote
-            })
+def group_hub(exchanges: Iterable[str]) -> Optional[str]:
+    """
+    映射组的参考交易所（价格验证以它为基准）
 
-    return mapping_groups
+    有XT时为XT，否则为 CONTRACT_EXTRACTORS 顺序中第一个出现的交易所
+    """
+    present = set(exchanges)
+    for exchange in CONTRACT_EXTRACTORS:
+        if exchange in present:
+            return exchange
+    return None
 
 
-def filter_xt_mappings(mapping_groups: Dict[str, List[Dict]]) -> Dict[str, Dict]:
+def select_mappings(mapping_groups: Dict[str, List[Dict]], hub: Optional[str] = None) -> Dict[str, Dict]:
     """
-    过滤出包含XT的映射组
+    为每个映射组的每个交易所选出一个交易对
 
-    当同一个标准化key有多个XT交易对时，优先选择multiplier大的
-    （如1000shib_usdt优先于shib_usdt，因为其他交易所通常用1000SHIB）
+    参考交易所有多个交易对时，优先选择multiplier大的
+    （如1000shib_usdt优先于shib_usdt，因为其他交易所通常用1000SHIB），其他交易所取第一个
+
+    Args:
+        mapping_groups: build_mapping_groups 的结果
+        hub: 只保留包含该交易所的映射组并以它为参考；None 时保留所有映射组，
+             参考交易所由 group_hub 决定
 
     Returns:
         {
@@ -351,30 +308,73 @@ def filter_xt_mappings(mapping_groups: Dict[str, List[Dict]]) -> Dict[str, Dict]
             }
         }
     """
-    xt_mappings = {}
+    mappings = {}
 
     for key, contracts in mapping_groups.items():
-        # 检查是否包含XT
-        has_xt = any(c['exchange'] == 'xt' for c in contracts)
-        if not has_xt:
+        group_exchanges = [c['exchange'] for c in contracts]
+        if hub is not None and hub not in group_exchanges:
             continue
+        reference = hub if hub is not None else group_hub(group_exchanges)
 
-        # 为每个交易所选择最合适的交易对
         mapping = {}
         for contract in contracts:
             exchange = contract['exchange']
 
             if exchange not in mapping:
                 mapping[exchange] = contract
-            elif exchange == 'xt':
-                # 如果已经有XT交易对，选择multiplier更大的
-                # （如1000shib_usdt优先于shib_usdt）
+            elif exchange == reference:
                 if contract['multiplier'] > mapping[exchange]['multiplier']:
                     mapping[exchange] = contract
 
-        xt_mappings[key] = mapping
+        mappings[key] = mapping
+
+    return mappings
+
+
+def filter_xt_mappings(mapping_groups: Dict[str, List[Dict]]) -> Dict[str, Dict]:
+    """
+    过滤出包含XT的映射组
+
+    当同一个标准化key有多个XT交易对时，优先选择multiplier大的
+    （如1000shib_usdt优先于shib_usdt，因为其他交易所通常用1000SHIB）
+    """
+    return select_mappings(mapping_groups, hub='xt')
+
+
+def snapshot_mapping_groups(mapping_groups: Dict[str, List[Dict]]) -> Dict[Tuple[str, str], str]:
+    """
+    映射组快照: {(exchange, symbol): normalized_pair}
+
+    保存到 mapping_contract_snapshot，增量模式下与上次快照对比找出受影响的交易对
+    """
+    return {
+        (contract['exchange'], contract['symbol']): key
+        for key, contracts in mapping_groups.items()
+        for contract in contracts
+    }
+
+
+def diff_snapshots(previous: Dict[Tuple[str, str], str],
+                   current: Dict[Tuple[str, str], str]) -> Set[str]:
+    """
+    对比两次快照，返回受影响的标准化交易对
+
+    新上线、已下线以及标准化交易对发生变化的合约，其新旧交易对都算受影响
+    """
+    affected = set()
+
+    for node, pair in current.items():
+        previous_pair = previous.get(node)
+        if previous_pair != pair:
+            affected.add(pair)
+            if previous_pair is not None:
+                affected.add(previous_pair)
+
+    for node, pair in previous.items():
+        if node not in current:
+            affected.add(pair)
 
-    return xt_mappings
+    return affected
 
 
 def format_mapping_summary(xt_mappings: Dict[str, Dict]) -> str:
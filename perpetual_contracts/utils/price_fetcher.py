@@ -4,31 +4,74 @@
 """
 import aiohttp
 import asyncio
-from typing import Dict, Optional
+from typing import Callable, Dict, Hashable, Optional
+from urllib.parse import urlsplit
 import time
+from .http_client import acquire_http_session, release_http_session
+
+
+def _to_price(value) -> Optional[float]:
+    """将行情中的价格字段转换为float，无效值返回None"""
+    try:
+        return float(value) if value else None
+    except (TypeError, ValueError):
+        return None
 
 
 class PriceFetcher:
-    """价格获取器"""
+    """
+    价格获取器
 
-    def __init__(self, timeout: int = 10):
+    bulk=True 时使用批量行情模式：每个交易所只请求一次全量行情接口，
+    结果缓存为 {symbol: price} 表，之后的 get_price / get_prices_batch 直接查表；
+    某个交易所的全量行情获取失败时，该交易所回退到逐个symbol请求
+
+    并发控制：同时进行的请求总数不超过 max_concurrency，
+    同一主机不超过 per_host_limit
+    """
+
+    def __init__(self, timeout: int = 10, bulk: bool = False,
+                 max_concurrency: int = 50, per_host_limit: int = 10):
         self.timeout = timeout
+        self.bulk = bulk
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
         self.session = None
+        self._global_limit = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        # {exchange: {symbol: price}}，获取失败的交易所为None
+        self.snapshot: Dict[str, Optional[Dict[str, float]]] = {}
+        self._snapshot_tasks: Dict[str, asyncio.Future] = {}
 
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+        # 使用共享连接池；最后一个持有者退出时关闭（程序仍在直接使用的会话除外）
+        self.session = acquire_http_session()
+        self._global_limit = asyncio.Semaphore(self.max_concurrency)
+        self._host_limits = {}
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
-            await self.session.close()
+        self.session = None
+        await release_http_session()
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        """获取主机对应的并发限制"""
+        host = urlsplit(url).netloc
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = asyncio.Semaphore(self.per_host_limit)
+            self._host_limits[host] = limit
+        return limit
 
     async def _get(self, url: str) -> Optional[dict]:
-        """GET请求"""
+        """GET请求（受全局和单主机并发限制）"""
         try:
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    return await response.json()
+            # 先占用主机名额再占用全局名额，避免等待某个主机时占住全局名额
+            async with self._host_limit(url), self._global_limit:
+                timeout = aiohttp.ClientTimeout(total=self.timeout)
+                async with self.session.get(url, timeout=timeout) as response:
+                    if response.status == 200:
+                        return await response.json()
         except Exception as e:
             print(f"❌ 请求失败 {url}: {e}")
         return None
@@ -140,10 +183,152 @@ class PriceFetcher:
 
         return None
 
+    async def get_xt_tickers(self) -> Optional[Dict[str, float]]:
+        """
+        获取XT全部行情
+        API: https://fapi.xt.com/future/market/v1/public/q/tickers
+        """
+        url = "https://fapi.xt.com/future/market/v1/public/q/tickers"
+        data = await self._get(url)
+
+        if data and data.get('returnCode') == 0 and isinstance(data.get('result'), list):
+            return {t.get('s'): _to_price(t.get('c')) for t in data['result'] if t.get('s')}
+
+        return None
+
+    async def get_binance_tickers(self) -> Optional[Dict[str, float]]:
+        """
+        获取Binance全部行情
+        API: https://fapi.binance.com/fapi/v1/ticker/price
+        """
+        url = "https://fapi.binance.com/fapi/v1/ticker/price"
+        data = await self._get(url)
+
+        if isinstance(data, list):
+            return {t.get('symbol'): _to_price(t.get('price')) for t in data if t.get('symbol')}
+
+        return None
+
+    async def get_okx_tickers(self) -> Optional[Dict[str, float]]:
+        """
+        获取OKX全部永续合约行情
+        API: https://www.okx.com/api/v5/market/tickers
+        """
+        url = "https://www.okx.com/api/v5/market/tickers?instType=SWAP"
+        data = await self._get(url)
+
+        if data and data.get('code') == '0':
+            return {t.get('instId'): _to_price(t.get('last')) for t in data.get('data', []) if t.get('instId')}
+
+        return None
+
+    async def get_bybit_tickers(self) -> Optional[Dict[str, float]]:
+        """
+        获取Bybit全部USDT/USDC永续合约行情
+        API: https://api.bybit.com/v5/market/tickers
+        """
+        url = "https://api.bybit.com/v5/market/tickers?category=linear"
+        data = await self._get(url)
+
+        if data and data.get('retCode') == 0:
+            tickers = data.get('result', {}).get('list', [])
+            return {t.get('symbol'): _to_price(t.get('lastPrice')) for t in tickers if t.get('symbol')}
+
+        return None
+
+    async def get_gate_tickers(self) -> Optional[Dict[str, float]]:
+        """
+        获取Gate全部USDT永续合约行情
+        API: https://api.gateio.ws/api/v4/futures/usdt/tickers
+        """
+        url = "https://api.gateio.ws/api/v4/futures/usdt/tickers"
+        data = await self._get(url)
+
+        if isinstance(data, list):
+            return {t.get('contract'): _to_price(t.get('last')) for t in data if t.get('contract')}
+
+        return None
+
+    async def get_kucoin_tickers(self) -> Optional[Dict[str, float]]:
+        """
+        获取KuCoin全部合约行情
+        API: https://api-futures.kucoin.com/api/v1/allTickers
+        """
+        url = "https://api-futures.kucoin.com/api/v1/allTickers"
+        data = await self._get(url)
+
+        if data and data.get('code') == '200000' and isinstance(data.get('data'), list):
+            return {t.get('symbol'): _to_price(t.get('price')) for t in data['data'] if t.get('symbol')}
+
+        return None
+
+    async def get_mexc_tickers(self) -> Optional[Dict[str, float]]:
+        """
+        获取MEXC全部合约行情
+        API: https://contract.mexc.com/api/v1/contract/ticker
+        """
+        url = "https://contract.mexc.com/api/v1/contract/ticker"
+        data = await self._get(url)
+
+        if data and data.get('success') and isinstance(data.get('data'), list):
+            return {t.get('symbol'): _to_price(t.get('lastPrice')) for t in data['data'] if t.get('symbol')}
+
+        return None
+
+    async def get_tickers(self, exchange: str) -> Optional[Dict[str, float]]:
+        """
+        根据交易所获取全部行情 {symbol: price}
+        """
+        if exchange == 'xt':
+            return await self.get_xt_tickers()
+        elif exchange == 'binance':
+            return await self.get_binance_tickers()
+        elif exchange == 'okx':
+            return await self.get_okx_tickers()
+        elif exchange == 'bybit':
+            return await self.get_bybit_tickers()
+        elif exchange == 'gate':
+            return await self.get_gate_tickers()
+        elif exchange == 'kucoin':
+            return await self.get_kucoin_tickers()
+        elif exchange == 'mexc':
+            return await self.get_mexc_tickers()
+
+        return None
+
+    async def _load_exchange_snapshot(self, exchange: str) -> Optional[Dict[str, float]]:
+        """获取单个交易所的全量行情并写入快照"""
+        tickers = await self.get_tickers(exchange)
+        if tickers is None:
+            print(f"⚠️  {exchange}: 批量行情获取失败，回退到逐个请求")
+        self.snapshot[exchange] = tickers
+        return tickers
+
+    async def get_snapshot(self, exchange: str) -> Optional[Dict[str, float]]:
+        """
+        获取交易所的行情快照（每个交易所只请求一次，并发调用共享同一个请求）
+        """
+        task = self._snapshot_tasks.get(exchange)
+        if task is None:
+            task = asyncio.ensure_future(self._load_exchange_snapshot(exchange))
+            self._snapshot_tasks[exchange] = task
+        return await task
+
+    async def load_snapshot(self, exchanges: list):
+        """
+        并发预加载多个交易所的行情快照
+        """
+        await asyncio.gather(*(self.get_snapshot(exchange) for exchange in exchanges))
+
     async def get_price(self, exchange: str, symbol: str) -> Optional[float]:
         """
         根据交易所获取价格
         """
+        if self.bulk:
+            tickers = await self.get_snapshot(exchange)
+            if tickers is not None:
+                return tickers.get(symbol)
+
         if exchange == 'xt':
             return await self.get_xt_price(symbol)
         elif exchange == 'binance':
@@ -161,32 +346,54 @@ class PriceFetcher:
 
         return None
 
-    async def get_prices_batch(self, requests: list) -> Dict[str, Optional[float]]:
+    async def get_prices_batch(self, requests: list,
+                               on_progress: Optional[Callable[[int, int], None]] = None) -> Dict[Hashable, Optional[float]]:
         """
         批量获取价格
+
+        每个交易所（各自对应一个API主机）一个请求队列，各配 per_host_limit 个工作协程，
+        工作协程只从自己交易所的队列取请求：任意请求完成后立即开始下一个，
+        某个主机变慢时只有它自己的工作协程在等待，其他主机的请求照常进行；
+        总并发仍由 _get 中的全局限制控制
+
         Args:
             requests: [{'exchange': 'xt', 'symbol': 'btc_usdt', 'key': 'xt_btc_usdt'}, ...]
+                      key 可以是任意可哈希的值（如 (行, 列) 元组）
+            on_progress: 每完成一个请求回调一次 on_progress(已完成数, 总数)
         Returns:
             {'xt_btc_usdt': 50000.0, ...}
         """
-        tasks = []
-        keys = []
-
-        for req in requests:
-            exchange = req['exchange']
-            symbol = req['symbol']
-            key = req.get('key', f"{exchange}_{symbol}")
-
-            tasks.append(self.get_price(exchange, symbol))
-            keys.append(key)
-
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        if self.bulk:
+            await self.load_snapshot(list({req['exchange'] for req in requests}))
 
         prices = {}
-        for key, result in zip(keys, results):
-            if isinstance(result, Exception):
-                prices[key] = None
-            else:
-                prices[key] = result
+        total = len(requests)
+        done = 0
+
+        queues: Dict[str, list] = {}
+        for req in requests:
+            queues.setdefault(req['exchange'], []).append(req)
+
+        async def worker(pending):
+            nonlocal done
+            for req in pending:
+                exchange = req['exchange']
+                symbol = req['symbol']
+                key = req.get('key', f"{exchange}_{symbol}")
+
+                try:
+                    prices[key] = await self.get_price(exchange, symbol)
+                except Exception:
+                    prices[key] = None
+
+                done += 1
+                if on_progress:
+                    on_progress(done, total)
+
+        workers = []
+        for exchange_requests in queues.values():
+            pending = iter(exchange_requests)  # 同一交易所的工作协程共享同一个请求迭代器
+            workers.extend(worker(pending) for _ in range(min(self.per_host_limit, len(exchange_requests))))
+        await asyncio.gather(*workers)
 
         return prices
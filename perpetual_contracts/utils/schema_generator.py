@@ -1,27 +1,71 @@
 """
-数据库表结构生成工具 - TEXT类型版本
-所有字段统一使用TEXT类型，避免类型转换问题
+数据库表结构生成工具
+根据API返回值的Python类型推断列类型（BOOLEAN/BIGINT/NUMERIC/JSONB），
+类型不确定的字段（字符串、混合类型）使用TEXT
 """
-from typing import List, Dict, Set
+from typing import List, Dict, Iterable
 
 
-def collect_all_fields(data_samples: List[Dict]) -> Set[str]:
-    """收集所有字段名"""
-    fields = set()
+def infer_column_type(values: Iterable) -> str:
+    """
+    根据样本值推断PostgreSQL列类型
+
+    只看Python类型，不解析字符串内容（交易所常把数字放在字符串里，
+    但同一字段也可能出现空字符串，保守起见仍存TEXT）
+
+    Args:
+        values: 同一字段的所有样本值
+
+    Returns:
+        BOOLEAN / BIGINT / NUMERIC / JSONB / TEXT
+    """
+    kinds = set()
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            kinds.add('bool')
+        elif isinstance(value, int):
+            kinds.add('int')
+        elif isinstance(value, float):
+            kinds.add('float')
+        elif isinstance(value, (dict, list)):
+            kinds.add('json')
+        else:
+            kinds.add('text')
+
+    if kinds == {'bool'}:
+        return 'BOOLEAN'
+    if kinds == {'int'}:
+        return 'BIGINT'
+    if kinds and kinds <= {'int', 'float'}:
+        return 'NUMERIC'
+    if kinds == {'json'}:
+        return 'JSONB'
+    return 'TEXT'
+
+
+def collect_all_fields(data_samples: List[Dict]) -> Dict[str, str]:
+    """
+    收集所有字段名并推断类型
+
+    Returns:
+        {字段名: 列类型}
+    """
+    samples = {}
     for sample in data_samples:
-        for key in sample.keys():
+        for key, value in sample.items():
             # API字段名为id时，重命名为api_id避免冲突
-            if key == 'id':
-                fields.add('api_id')
-            else:
-                fields.add(key)
-    return fields
+            field_name = 'api_id' if key == 'id' else key
+            samples.setdefault(field_name, []).append(value)
+
+    return {field_name: infer_column_type(values) for field_name, values in samples.items()}
 
 
 def generate_table_schema(table_name: str, data_samples: List[Dict], primary_key: str = 'symbol') -> str:
     """
     根据数据样本生成PostgreSQL表结构
-    所有字段使用TEXT类型
+    字段类型由样本推断，主键固定为TEXT
 
     Args:
         table_name: 表名
@@ -41,13 +85,13 @@ def generate_table_schema(table_name: str, data_samples: List[Dict], primary_key
     sql_parts = [f"CREATE TABLE IF NOT EXISTS {table_name} ("]
     sql_parts.append("    id SERIAL PRIMARY KEY,")
 
-    # 添加所有字段（都是TEXT类型）
+    # 添加所有字段
     for field_name in sorted(all_fields):
         # 主键字段设置唯一约束
         if field_name == primary_key:
             sql_parts.append(f"    {field_name} TEXT UNIQUE NOT NULL,")
         else:
-            sql_parts.append(f"    {field_name} TEXT,")
+            sql_parts.append(f"    {field_name} {all_fields[field_name]},")
 
     # 添加时间戳
     sql_parts.append("    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,")
@@ -74,7 +118,7 @@ def generate_all_schemas(exchanges_data: Dict[str, List[Dict]]) -> str:
     """
     schemas = []
     schemas.append("-- 自动生成的数据库表结构")
-    schemas.append("-- 所有字段使用TEXT类型，保留API原始字段名\n")
+    schemas.append("-- 字段类型由API返回值推断，保留API原始字段名\n")
 
     for exchange_name, contracts in exchanges_data.items():
         if not contracts: